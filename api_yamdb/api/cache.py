@@ -0,0 +1,99 @@
+from hashlib import md5
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_KEY = 'api:version:{}'
+RESPONSE_KEY = 'api:response:{}'
+# Область, от которой зависят все ответы: ее смена сбрасывает весь
+# кэш ответов, не трогая остальные записи общего кэша.
+ALL_RESPONSES = 'responses'
+# Область ответов, в которых видны имена авторов (отзывы, комментарии).
+AUTHORS = 'authors'
+
+
+def get_versions(scopes):
+    """Текущие версии областей кэша; недостающие создаем."""
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid4().hex, None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*scopes):
+    """
+    Меняем версии областей кэша: все ответы, ключи которых
+    построены на старых версиях, больше не будут найдены.
+    """
+    cache.set_many(
+        {VERSION_KEY.format(scope): uuid4().hex for scope in scopes}, None
+    )
+
+
+def resource_version(request, scopes):
+    """
+    Версия ресурса: хэш от версий областей (и общей ALL_RESPONSES),
+    формата, схемы и хоста (ответы содержат абсолютные ссылки
+    next/previous), пути и упорядоченных параметров запроса.
+    """
+    query = urlencode(sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    ))
+    raw_version = '|'.join((
+        *get_versions((ALL_RESPONSES, *scopes)),
+        request.accepted_renderer.format,
+        f'{request.scheme}://{request.get_host()}{request.path}?{query}',
+    ))
+    return md5(raw_version.encode()).hexdigest()
+
+
+def is_cacheable(request):
+    """Кэшируем ответы только для анонимных пользователей."""
+    return (settings.API_RESPONSE_CACHE_TIMEOUT
+            and not request.user.is_authenticated)
+
+
+def is_not_modified(request, etag):
+    """Клиент уже получил эту версию ресурса."""
+    return etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+
+
+def cached_response(view, handler, request, *args, **kwargs):
+    """
+    Отвечаем 304 на If-None-Match с текущей версией ресурса,
+    иначе отдаем ответ из кэша или сохраняем его туда после рендеринга.
+    """
+    if request.method != 'GET':
+        return handler(request, *args, **kwargs)
+    version = resource_version(request, view.get_cache_scopes())
+    etag = quote_etag(version)
+    if is_not_modified(request, etag):
+        return Response(
+            status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+        )
+    cacheable = is_cacheable(request)
+    key = RESPONSE_KEY.format(version)
+    if cacheable:
+        response = cache.get(key)
+        if response is not None:
+            return response
+    response = handler(request, *args, **kwargs)
+    if response.status_code == status.HTTP_200_OK:
+        response['ETag'] = etag
+        if cacheable:
+            response.add_post_render_callback(
+                lambda rendered: cache.set(
+                    key, rendered, settings.API_RESPONSE_CACHE_TIMEOUT
+                )
+            )
+    return response
@@ -0,0 +1,131 @@
+import json
+from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
+
+from rest_framework.fields import DateTimeField
+
+from reviews.models import Genre, GenreTitle, Review, Title
+
+TITLE_FIELDS = (
+    'id', 'name', 'year', 'description', 'score_sum', 'score_count',
+    'category__name', 'category__slug',
+)
+REVIEW_FIELDS = ('id', 'title_id', 'text', 'author__username', 'score',
+                 'pub_date')
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+
+def title_batches(chunk_size):
+    """Произведения пачками по id: каждая пачка - отдельный запрос."""
+    last_id = 0
+    while True:
+        batch = list(
+            Title.objects.filter(id__gt=last_id).order_by('id').values(
+                *TITLE_FIELDS
+            )[:chunk_size]
+        )
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]['id']
+
+
+def genres_by_title(title_ids):
+    """Жанры произведений в порядке Genre.Meta.ordering, как в API."""
+    genres = defaultdict(list)
+    rows = GenreTitle.objects.filter(title_id__in=title_ids).order_by(
+        'title_id', *(f'genre__{field}' for field in Genre._meta.ordering)
+    ).values_list('title_id', 'genre__name', 'genre__slug')
+    for title_id, name, slug in rows:
+        genres[title_id].append({'name': name, 'slug': slug})
+    return genres
+
+
+def review_rows(title_ids):
+    """Отзывы произведений по порядку id произведения, читаются потоком."""
+    return Review.objects.filter(title_id__in=title_ids).order_by(
+        'title_id', '-pub_date', 'id'
+    ).values(*REVIEW_FIELDS).iterator()
+
+
+def review_record(row, date_field):
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'author': row['author__username'],
+        'score': row['score'],
+        'pub_date': date_field.to_representation(row['pub_date']),
+    }
+
+
+def title_record(row, genres):
+    """Произведение в том же виде, что и в API."""
+    category = None
+    if row['category__slug'] is not None:
+        category = {
+            'name': row['category__name'], 'slug': row['category__slug']
+        }
+    rating = None
+    if row['score_count']:
+        rating = int(row['score_sum'] / row['score_count'])
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'year': row['year'],
+        'description': row['description'],
+        'genre': genres.get(row['id'], []),
+        'category': category,
+        'rating': rating,
+    }
+
+
+def title_line(record, reviews, date_field):
+    """Строка JSON Lines по частям: отзывы дописываются по одному."""
+    yield json.dumps(record, ensure_ascii=False)[:-1] + ', "reviews": ['
+    separator = ''
+    for row in reviews:
+        yield separator + json.dumps(
+            review_record(row, date_field), ensure_ascii=False
+        )
+        separator = ', '
+    yield ']}\n'
+
+
+def title_lines(chunk_size):
+    date_field = DateTimeField()
+    for batch in title_batches(chunk_size):
+        title_ids = [row['id'] for row in batch]
+        genres = genres_by_title(title_ids)
+        groups = groupby(review_rows(title_ids), itemgetter('title_id'))
+        title_id, reviews = next(groups, (None, ()))
+        for row in batch:
+            # Группу отзывов читаем до перехода к следующей: groupby
+            # не хранит прочитанные строки.
+            found = title_id == row['id']
+            yield from title_line(
+                title_record(row, genres), reviews if found else (),
+                date_field
+            )
+            if found:
+                title_id, reviews = next(groups, (None, ()))
+
+
+def titles_jsonl(chunk_size):
+    """
+    Все произведения в формате JSON Lines. Жанры читаются одним
+    запросом на пачку из chunk_size произведений, отзывы пачки - одним
+    потоковым запросом и сразу пишутся в ответ, поэтому в памяти
+    не больше пачки произведений и EXPORT_BUFFER_SIZE байт вывода,
+    сколько бы отзывов ни было у произведения.
+    """
+    buffer, size = [], 0
+    for part in title_lines(chunk_size):
+        part = part.encode()
+        buffer.append(part)
+        size += len(part)
+        if size >= EXPORT_BUFFER_SIZE:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
@@ -1,15 +1,66 @@
+import re
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
+from django.db.models import Q
 from django_filters import rest_framework as filters
 
 from reviews.models import Title
+from .object_cache import category_cache, genre_cache
+
+SEARCH_TOKENS = re.compile(r'\w+')
+
+
+def fts_query(value):
+    """Строим запрос FTS5: все слова строки, последнее - как префикс."""
+    words = SEARCH_TOKENS.findall(value)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"' for word in words) + '*'
 
 
 class TitleFilter(filters.FilterSet):
     """Фильтр для произведений."""
 
-    genre = filters.CharFilter(field_name='genre__slug')
+    genre = filters.CharFilter(method='filter_genre')
     name = filters.CharFilter(field_name='name', lookup_expr='icontains')
-    category = filters.CharFilter(field_name='category__slug')
+    category = filters.CharFilter(method='filter_category')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('genre', 'name', 'category', 'year')
+        fields = ('genre', 'name', 'category', 'year', 'search')
+
+    def filter_genre(self, queryset, name, value):
+        """Жанр по слагу берем из кэша и фильтруем по его id."""
+        try:
+            genre = genre_cache.get('slug', value)
+        except ObjectDoesNotExist:
+            return queryset.none()
+        return queryset.filter(genre=genre.id)
+
+    def filter_category(self, queryset, name, value):
+        """Категорию по слагу берем из кэша и фильтруем по ее id."""
+        try:
+            category = category_cache.get('slug', value)
+        except ObjectDoesNotExist:
+            return queryset.none()
+        return queryset.filter(category=category.id)
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию, лучшие - первыми."""
+        query = fts_query(value)
+        if query is None:
+            return queryset
+        if connection.vendor != 'sqlite':
+            return queryset.filter(
+                Q(name__icontains=value) | Q(description__icontains=value)
+            )
+        return queryset.extra(
+            tables=('reviews_title_fts',),
+            where=('reviews_title_fts.rowid = reviews_title.id',
+                   'reviews_title_fts MATCH %s'),
+            params=(query,),
+            select={'search_rank': 'reviews_title_fts.rank'},
+            order_by=('search_rank', 'name', 'id'),
+        )
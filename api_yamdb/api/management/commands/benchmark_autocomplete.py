@@ -0,0 +1,104 @@
+import random
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.test import APIRequestFactory
+
+from api.views import TitleViewSet
+from reviews.models import Title
+from reviews.utils import normalize_name
+
+WORDS = (
+    'алый', 'белый', 'вечер', 'город', 'дорога', 'звезда', 'зима', 'лес',
+    'море', 'ночь', 'огонь', 'остров', 'поле', 'река', 'сад', 'свет',
+    'солнце', 'тень', 'туман', 'ветер', 'black', 'blue', 'city', 'dark',
+    'dream', 'fire', 'king', 'light', 'night', 'river', 'road', 'star',
+)
+INSERT_BATCH_SIZE = 5000
+
+
+def title_names(number, rng):
+    """Случайные названия из трех слов и номера: префиксы повторяются."""
+    for index in range(number):
+        yield ' '.join(rng.choices(WORDS, k=3)) + f' {index}'
+
+
+def create_titles(number, rng):
+    """Добавляем number произведений пачками, без сигналов."""
+    names = title_names(number, rng)
+    for start in range(0, number, INSERT_BATCH_SIZE):
+        Title.objects.bulk_create(
+            Title(name=name, name_normalized=normalize_name(name),
+                  year=rng.randint(1900, 2022))
+            for name in (
+                next(names)
+                for _ in range(min(INSERT_BATCH_SIZE, number - start))
+            )
+        )
+
+
+def percentile(timings, fraction):
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+class Command(BaseCommand):
+    help = "Замеряем время ответа /api/v1/titles/autocomplete/"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--titles', type=int, default=1000000,
+            help='Сколько произведений добавить на время замера'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=2000,
+            help='Количество запросов подсказок'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Начальное значение генератора случайных названий'
+        )
+
+    def handle(self, *args, **options):
+        if options['titles'] < 0 or options['requests'] < 1:
+            raise CommandError('--titles >= 0 и --requests >= 1')
+        rng = random.Random(options['seed'])
+        view = TitleViewSet.as_view({'get': 'autocomplete'})
+        factory = APIRequestFactory()
+        with transaction.atomic():
+            start = perf_counter()
+            create_titles(options['titles'], rng)
+            self.stdout.write(
+                f'Добавлено произведений: {options["titles"]} '
+                f'за {perf_counter() - start:.1f} с, '
+                f'всего {Title.objects.count()}'
+            )
+            names = list(title_names(options['requests'], rng))
+            requests = [
+                factory.get('/api/v1/titles/autocomplete/', {
+                    'q': name[:rng.randint(1, 8)]
+                })
+                for name in names
+            ]
+            view(requests[0])
+            timings = []
+            for request in requests:
+                start = perf_counter()
+                response = view(request)
+                response.render()
+                timings.append(perf_counter() - start)
+                if response.status_code != 200:
+                    raise CommandError(
+                        f'Подсказки вернули {response.status_code}'
+                    )
+            # Добавленные для замера произведения не сохраняем.
+            transaction.set_rollback(True)
+        timings.sort()
+        self.stdout.write(', '.join(
+            f'{label} {value * 1000:.2f} мс'
+            for label, value in (
+                ('p50', percentile(timings, 0.5)),
+                ('p99', percentile(timings, 0.99)),
+                ('max', timings[-1]),
+            )
+        ))
@@ -0,0 +1,70 @@
+from timeit import repeat
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.renderers import FastJSONRenderer
+from api.views import CommentViewSet, ReviewViewSet, TitleViewSet
+from reviews.models import Review, Title
+
+
+def get_cases():
+    """Страницы списков с наибольшим числом объектов."""
+    title = Title.objects.annotate(
+        reviews_count=Count('reviews')
+    ).order_by('-reviews_count').first()
+    review = Review.objects.annotate(
+        comments_count=Count('comments')
+    ).order_by('-comments_count').first()
+    if title is None or review is None:
+        raise CommandError(
+            'Нет данных для замера, загрузите их командой import_data'
+        )
+    return (
+        ('titles', TitleViewSet, {}),
+        ('reviews', ReviewViewSet, {'title_id': title.id}),
+        ('comments', CommentViewSet,
+         {'title_id': review.title_id, 'review_id': review.id}),
+    )
+
+
+def page_data(viewset, kwargs):
+    """Данные первой страницы списка в том виде, в каком их рендерит API."""
+    request = Request(APIRequestFactory().get('/'))
+    view = viewset(action='list', kwargs=kwargs, request=request,
+                   format_kwarg=None)
+    page = view.paginate_queryset(view.filter_queryset(view.get_queryset()))
+    serializer = view.get_serializer(page, many=True)
+    return view.get_paginated_response(serializer.data).data
+
+
+class Command(BaseCommand):
+    help = "Сравниваем скорость JSONRenderer и FastJSONRenderer"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--number', type=int, default=2000,
+            help='Количество рендерингов в одном замере'
+        )
+
+    def handle(self, *args, **options):
+        number = options['number']
+        renderers = (JSONRenderer(), FastJSONRenderer())
+        for name, viewset, kwargs in get_cases():
+            data = page_data(viewset, kwargs)
+            default, fast = (renderer.render(data) for renderer in renderers)
+            if default != fast:
+                raise CommandError(f'{name}: ответы рендереров отличаются')
+            default_time, fast_time = (
+                min(repeat(lambda: renderer.render(data),
+                           number=number, repeat=5)) / number
+                for renderer in renderers
+            )
+            self.stdout.write(
+                f'{name}: JSONRenderer {default_time * 1e6:.1f} мкс, '
+                f'FastJSONRenderer {fast_time * 1e6:.1f} мкс '
+                f'(x{default_time / fast_time:.2f}, {len(fast)} байт)'
+            )
@@ -0,0 +1,121 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+from django.http import Http404
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory
+
+from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
+                       ReviewViewSet, TitleViewSet)
+from reviews.models import Category, Genre, Review, Title
+
+
+def sample_values():
+    """Значения для фильтров берем из базы, чтобы планы были реальными."""
+    title = Title.objects.order_by('id').first()
+    review = Review.objects.order_by('id').first()
+    category = Category.objects.order_by('id').first()
+    genre = Genre.objects.order_by('id').first()
+    return {
+        'title_id': review.title_id if review else getattr(title, 'id', 1),
+        'review_id': getattr(review, 'id', 1),
+        'year': getattr(title, 'year', 2000),
+        'category': getattr(category, 'slug', 'category'),
+        'genre': getattr(genre, 'slug', 'genre'),
+    }
+
+
+def get_cases():
+    values = sample_values()
+    nested = {'title_id': values['title_id']}
+    return (
+        ('categories', CategoryViewSet, {}, {}),
+        ('categories?search', CategoryViewSet, {'search': 'a'}, {}),
+        ('genres', GenreViewSet, {}, {}),
+        ('titles', TitleViewSet, {}, {}),
+        ('titles?ordering=name', TitleViewSet, {'ordering': 'name'}, {}),
+        ('titles?category', TitleViewSet,
+         {'category': values['category']}, {}),
+        ('titles?category&year', TitleViewSet,
+         {'category': values['category'], 'year': values['year']}, {}),
+        ('titles?genre', TitleViewSet, {'genre': values['genre']}, {}),
+        ('titles?year', TitleViewSet, {'year': values['year']}, {}),
+        ('titles?name', TitleViewSet, {'name': 'a'}, {}),
+        ('titles?search', TitleViewSet, {'search': 'a'}, {}),
+        ('reviews', ReviewViewSet, {}, nested),
+        ('comments', CommentViewSet, {},
+         {**nested, 'review_id': values['review_id']}),
+    )
+
+
+def build_queryset(viewset, params, kwargs):
+    """Запрос страницы списка так, как его строит вьюсет."""
+    request = Request(APIRequestFactory().get('/', params))
+    view = viewset(action='list', kwargs=kwargs, request=request,
+                   format_kwarg=None)
+    queryset = view.filter_queryset(view.get_queryset())
+    return queryset[:api_settings.PAGE_SIZE]
+
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+# Параметры, которые меняют только порядок строк, а не отбирают их.
+ORDERING_PARAMS = ('ordering',)
+
+
+def is_problem(detail, filtered):
+    """
+    Сортировка во временном дереве или полный просмотр таблицы.
+    SCAN по индексу без фильтров читает строки в порядке ORDER BY
+    и останавливается на LIMIT страницы, а с фильтрами проходит
+    все строки, поэтому тоже считается проблемой. Поиск по виртуальной
+    таблице FTS - это обращение к ее индексу, а не просмотр.
+    """
+    if 'TEMP B-TREE' in detail:
+        return True
+    if not detail.startswith('SCAN') or 'VIRTUAL TABLE' in detail:
+        return False
+    return 'INDEX' not in detail or filtered
+
+
+class Command(BaseCommand):
+    help = "Показываем планы запросов списков API и ищем полные просмотры"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fail-on-problems', action='store_true',
+            help='Завершиться с ошибкой, если найдены проблемные планы'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN поддерживается для SQLite')
+        problems = 0
+        for name, viewset, params, kwargs in get_cases():
+            try:
+                plan = explain(build_queryset(viewset, params, kwargs))
+            except Http404:
+                self.stdout.write(f'{name}: родительский объект не найден')
+                continue
+            except EmptyResultSet:
+                self.stdout.write(f'{name}: пустая выборка, запроса нет')
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            filtered = bool(set(params) - set(ORDERING_PARAMS))
+            for detail in plan:
+                if is_problem(detail, filtered):
+                    problems += 1
+                    self.stdout.write(self.style.WARNING(f'  ! {detail}'))
+                else:
+                    self.stdout.write(f'    {detail}')
+        if problems and options['fail_on_problems']:
+            raise CommandError(f'Найдено проблемных шагов: {problems}')
+        self.stdout.write(
+            self.style.SUCCESS(f'Проблемных шагов: {problems}')
+        )
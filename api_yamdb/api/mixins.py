@@ -1,11 +1,65 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, viewsets
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
 
+from .cache import cached_response
 from .permissions import IsAdminOrReadOnly
 
 
-class CreateDestroyListViewSet(mixins.CreateModelMixin,
+class CachedListMixin:
+    """Кэширование ответов на анонимные запросы списка."""
+    cache_scopes = ()
+
+    def get_cache_scopes(self):
+        return self.cache_scopes
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(self, super().list, request, *args, **kwargs)
+
+
+class ValuesListMixin:
+    """
+    Список читаем через values() и values_serializer_class:
+    без создания моделей и обхода полей ModelSerializer.
+    """
+    values_serializer_class = None
+
+    def check_empty_list(self):
+        """
+        Вызывается, только если список пуст: вложенные списки здесь
+        проверяют, что родительский объект существует (иначе 404).
+        Для непустого списка отдельный запрос не нужен.
+        """
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.values_serializer_class
+        queryset = serializer_class.get_values(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if not (queryset if page is None else page):
+            self.check_empty_list()
+        if page is not None:
+            return self.get_paginated_response(
+                serializer_class(page, many=True).data
+            )
+        return Response(serializer_class(queryset, many=True).data)
+
+
+class CachedReadMixin(CachedListMixin):
+    """Кэширование ответов на анонимные запросы списка и объекта."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(
+            self, super().retrieve, request, *args, **kwargs
+        )
+
+
+class CreateDestroyListViewSet(CachedListMixin,
+                               mixins.CreateModelMixin,
                                mixins.DestroyModelMixin,
                                mixins.ListModelMixin,
                                viewsets.GenericViewSet):
@@ -15,3 +69,15 @@ class CreateDestroyListViewSet(mixins.CreateModelMixin,
     filter_backends = (DjangoFilterBackend, filters.SearchFilter)
     search_fields = ('name',)
     lookup_field = 'slug'
+    object_cache = None
+
+    def get_object(self):
+        """Объект справочника по слагу берем из кэша."""
+        try:
+            obj = self.object_cache.get(
+                self.lookup_field, self.kwargs[self.lookup_field]
+            )
+        except ObjectDoesNotExist:
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
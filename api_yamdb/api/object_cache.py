@@ -0,0 +1,104 @@
+import threading
+from collections import OrderedDict
+from time import monotonic
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+
+from reviews.models import Category, Genre
+
+VERSION_KEY = 'api:objects:{}:version'
+OBJECT_KEY = 'api:objects:{}:{}:{}:{}'
+
+
+class ObjectCache:
+    """
+    Двухуровневый кэш объектов маленьких справочников.
+    Первый уровень - LRU в памяти процесса с коротким временем жизни,
+    второй - кэш cache_alias, общий для всех процессов. Объекты доступны
+    по id и по слагу, сброс - сменой версии в общем кэше.
+    """
+    lookup_fields = ('id', 'slug')
+    cache_alias = 'shared'
+
+    def __init__(self, model):
+        self.model = model
+        self.label = model._meta.label_lower
+        self.local = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        # Поля сериализаторов копируются вместе с аргументами,
+        # а кэш должен оставаться общим для процесса.
+        return self
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def get_version(self):
+        key = VERSION_KEY.format(self.label)
+        version = self.cache.get(key)
+        if version is None:
+            self.cache.add(key, uuid4().hex, None)
+            version = self.cache.get(key)
+        return version
+
+    def get_local(self, field, value):
+        with self.lock:
+            entry = self.local.get((field, value))
+            if entry is None:
+                return None
+            expires, obj = entry
+            if expires < monotonic():
+                del self.local[(field, value)]
+                return None
+            self.local.move_to_end((field, value))
+            return obj
+
+    def set_local(self, obj):
+        expires = monotonic() + settings.OBJECT_CACHE_LOCAL_TIMEOUT
+        with self.lock:
+            for field in self.lookup_fields:
+                key = (field, getattr(obj, field))
+                self.local[key] = (expires, obj)
+                self.local.move_to_end(key)
+            while len(self.local) > settings.OBJECT_CACHE_SIZE:
+                self.local.popitem(last=False)
+
+    def get(self, field, value):
+        """Объект по id или слагу; если его нет - DoesNotExist."""
+        value = self.model._meta.get_field(field).to_python(value)
+        obj = self.get_local(field, value)
+        if obj is not None:
+            return obj
+        version = self.get_version()
+        obj = self.cache.get(
+            OBJECT_KEY.format(self.label, version, field, value)
+        )
+        if obj is None:
+            obj = self.model.objects.get(**{field: value})
+            self.cache.set_many({
+                OBJECT_KEY.format(
+                    self.label, version, name, getattr(obj, name)
+                ): obj
+                for name in self.lookup_fields
+            }, settings.OBJECT_CACHE_TIMEOUT)
+        self.set_local(obj)
+        return obj
+
+    def clear_local(self):
+        with self.lock:
+            self.local.clear()
+
+    def invalidate(self):
+        """Сбрасываем кэш во всех процессах сменой версии."""
+        self.cache.set(
+            VERSION_KEY.format(self.label), uuid4().hex, None
+        )
+        self.clear_local()
+
+
+category_cache = ObjectCache(Category)
+genre_cache = ObjectCache(Genre)
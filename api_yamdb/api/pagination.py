@@ -0,0 +1,157 @@
+import json
+from functools import partial
+
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+
+
+def _keyset_filter(ordering, position, reverse):
+    """Условие «строго после позиции» для составного ключа сортировки."""
+    condition = Q()
+    equal = {}
+    for field, value in zip(ordering, position):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+        condition |= Q(**equal, **{f'{name}__{lookup}': value})
+        equal[name] = value
+    return condition
+
+
+class KeysetPagination(pagination.CursorPagination):
+    """
+    Курсорная пагинация по уникальному составному ключу.
+    Позиция хранит значения всех полей сортировки, поэтому страница
+    выбирается условием по индексу, без OFFSET и COUNT.
+    """
+    ordering = ('id',)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, 'filter_backends', ()):
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        ordering = tuple(ordering or self.ordering)
+        if ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering += ('id',)
+        return ordering
+
+    def _get_position_from_instance(self, instance, ordering):
+        # Страница может состоять из моделей или из словарей values().
+        get_value = (instance.get if isinstance(instance, dict)
+                     else partial(getattr, instance))
+        return json.dumps([
+            str(get_value(field.lstrip('-'))) for field in ordering
+        ])
+
+    def _decode_position(self, position):
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(values, list)
+                or len(values) != len(self.ordering)):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def _set_positions(self, reverse, offset, current_position,
+                       following_position):
+        has_current = current_position is not None or offset > 0
+        has_following = following_position is not None
+        if reverse:
+            self.has_next, self.has_previous = has_current, has_following
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next, self.has_previous = has_following, has_current
+            self.next_position = following_position
+            self.previous_position = current_position
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(
+                *pagination._reverse_ordering(self.ordering)
+            )
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(_keyset_filter(
+                self.ordering,
+                self._decode_position(current_position),
+                reverse
+            ))
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        if reverse:
+            self.page = list(reversed(self.page))
+        self._set_positions(reverse, offset, current_position,
+                            following_position)
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+
+class OptionalKeysetPagination(pagination.PageNumberPagination):
+    """
+    Постраничная пагинация, которая переключается на курсорную,
+    если в запросе передан параметр cursor (для первой страницы - пустой).
+    """
+    keyset_ordering = ('id',)
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if KeysetPagination.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+        self.keyset = KeysetPagination()
+        self.keyset.ordering = self.keyset_ordering
+        self.keyset.page_size = self.page_size
+        return self.keyset.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.keyset is not None:
+            return self.keyset.to_html()
+        return super().to_html()
+
+
+class TitlePagination(OptionalKeysetPagination):
+    """Пагинация произведений."""
+    keyset_ordering = ('name', 'id')
+
+
+class ReviewPagination(OptionalKeysetPagination):
+    """Пагинация отзывов."""
+    keyset_ordering = ('-pub_date', 'id')
+
+
+class CommentPagination(OptionalKeysetPagination):
+    """Пагинация комментариев."""
+    keyset_ordering = ('pub_date', 'id')
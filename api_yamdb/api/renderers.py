@@ -0,0 +1,42 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.compat import LONG_SEPARATORS, SHORT_SEPARATORS
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer с тем же результатом побайтно, но без лишней работы
+    на каждый ответ. Сериализаторы API (TitleSerializer,
+    ReviewSerializer, CommentSerializer и остальные) отдают дерево
+    из словарей, списков, строк и чисел: даты уже отформатированы
+    полями, циклов нет. Поэтому один заранее настроенный кодировщик
+    без проверки циклов переиспользуется между ответами, а замена
+    U+2028/U+2029 выполняется, только если эти символы есть в ответе.
+    Ответы с отступами (например, для Browsable API) рендерит
+    обычный JSONRenderer.
+    """
+    _encoder = None
+
+    @classmethod
+    def get_encoder(cls):
+        if cls.__dict__.get('_encoder') is None:
+            cls._encoder = cls.encoder_class(
+                ensure_ascii=cls.ensure_ascii,
+                allow_nan=not cls.strict,
+                separators=(SHORT_SEPARATORS if cls.compact
+                            else LONG_SEPARATORS),
+                check_circular=False,
+            )
+        return cls._encoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (data is None
+                or accepted_media_type and 'indent' in accepted_media_type
+                or renderer_context and renderer_context.get('indent')):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        ret = self.get_encoder().encode(data)
+        if '\u2028' in ret or '\u2029' in ret:
+            ret = ret.replace('\u2028', '\\u2028').replace(
+                '\u2029', '\\u2029'
+            )
+        return ret.encode()
@@ -1,11 +1,37 @@
+from collections import defaultdict
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.encoding import smart_str
 from rest_framework import serializers
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title)
+from .object_cache import category_cache, genre_cache
 from .validators import title_year_validator
 
 
+class CachedSlugRelatedField(serializers.SlugRelatedField):
+    """Связь по слагу, объекты берутся из кэша справочника."""
+
+    def __init__(self, object_cache, **kwargs):
+        self.object_cache = object_cache
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            return self.object_cache.get(self.slug_field, data)
+        except ObjectDoesNotExist:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=smart_str(data))
+        except (TypeError, ValueError):
+            self.fail('invalid')
+
+
 class ReviewSerializer(serializers.ModelSerializer):
-    """Обработка отзывов."""
+    """
+    Обработка отзывов. Повторный отзыв автора на произведение
+    отклоняет ограничение unique_author_rewiev в базе, см. ReviewViewSet.
+    """
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username',
@@ -17,20 +43,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         max_value=10
     )
 
-    def validate(self, data):
-        request = self.context['request']
-        view = self.context['view']
-        author = request.user
-        title_id = view.kwargs.get('title_id')
-
-        if (Review.objects.filter(
-            author=author, title_id=title_id).exists()
-                and request.method != 'PATCH'):
-            raise serializers.ValidationError(
-                'Нельзя оставлять отзыв несколько раз'
-            )
-        return data
-
     class Meta:
         fields = ('id', 'text', 'author', 'score', 'pub_date')
         model = Review
@@ -70,8 +82,7 @@ class TitleSerializer(serializers.ModelSerializer):
 
     category = CategorySerializer()
     genre = GenreSerializer(many=True)
-    rating = serializers.IntegerField(source='reviews__score__avg',
-                                      read_only=True)
+    rating = serializers.IntegerField(read_only=True)
     year = serializers.IntegerField(validators=[title_year_validator])
 
     class Meta:
@@ -84,11 +95,13 @@ class TitleSerializer(serializers.ModelSerializer):
 class TitleCreateSerializer(TitleSerializer):
     """Сериализатор для создания произведений."""
 
-    category = serializers.SlugRelatedField(
+    category = CachedSlugRelatedField(
+        object_cache=category_cache,
         slug_field='slug',
         queryset=Category.objects.all()
     )
-    genre = serializers.SlugRelatedField(
+    genre = CachedSlugRelatedField(
+        object_cache=genre_cache,
         slug_field='slug',
         queryset=Genre.objects.all(),
         many=True
@@ -102,3 +115,91 @@ class TitleCreateSerializer(TitleSerializer):
                   'genre',
                   'category')
         model = Title
+
+
+class ValuesSerializer(serializers.BaseSerializer):
+    """
+    Сериализатор списков только для чтения: строки приходят из values(),
+    ответ собирается из них напрямую, без создания моделей и обхода
+    полей ModelSerializer. Результат совпадает с основным сериализатором.
+    """
+    values_fields = ()
+    date_time = serializers.DateTimeField()
+
+    @classmethod
+    def get_values(cls, queryset):
+        return queryset.prefetch_related(None).values(*cls.values_fields)
+
+
+class ReviewValuesSerializer(ValuesSerializer):
+    """Отзывы в формате ReviewSerializer."""
+    values_fields = ('id', 'text', 'author__username', 'score', 'pub_date')
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'score': row['score'],
+            'pub_date': self.date_time.to_representation(row['pub_date']),
+        }
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    """Комментарии в формате CommentSerializer."""
+    values_fields = ('id', 'text', 'author__username', 'pub_date')
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'pub_date': self.date_time.to_representation(row['pub_date']),
+        }
+
+
+class TitleValuesListSerializer(serializers.ListSerializer):
+    """Жанры всех произведений страницы читаем одним запросом."""
+
+    def to_representation(self, data):
+        rows = list(data)
+        genres = defaultdict(list)
+        genre_rows = GenreTitle.objects.filter(
+            title_id__in=[row['id'] for row in rows]
+        ).order_by(*(
+            f'genre__{field}' for field in Genre._meta.ordering
+        )).values_list('title_id', 'genre__name', 'genre__slug')
+        for title_id, name, slug in genre_rows:
+            genres[title_id].append({'name': name, 'slug': slug})
+        for row in rows:
+            row['genre'] = genres[row['id']]
+        return [self.child.to_representation(row) for row in rows]
+
+
+class TitleValuesSerializer(ValuesSerializer):
+    """Произведения в формате TitleSerializer."""
+    values_fields = ('id', 'name', 'year', 'description', 'score_sum',
+                     'score_count', 'category__name', 'category__slug')
+
+    class Meta:
+        list_serializer_class = TitleValuesListSerializer
+
+    def to_representation(self, row):
+        category = None
+        if row['category__slug'] is not None:
+            category = {
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            }
+        rating = None
+        if row['score_count']:
+            rating = int(row['score_sum'] / row['score_count'])
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'year': row['year'],
+            'description': row['description'],
+            'genre': row['genre'],
+            'category': category,
+            'rating': rating,
+        }
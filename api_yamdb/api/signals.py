@@ -0,0 +1,62 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import CustomUser
+from .cache import AUTHORS, bump_versions
+from .object_cache import category_cache, genre_cache
+
+
+@receiver((post_save, post_delete), sender=Category)
+def category_changed(sender, instance, **kwargs):
+    category_cache.invalidate()
+    bump_versions('categories', 'titles')
+
+
+@receiver((post_save, post_delete), sender=Genre)
+def genre_changed(sender, instance, **kwargs):
+    genre_cache.invalidate()
+    bump_versions('genres', 'titles')
+
+
+@receiver((post_save, post_delete), sender=Title)
+def title_changed(sender, instance, **kwargs):
+    bump_versions('titles', f'title:{instance.pk}')
+
+
+@receiver((post_save, post_delete), sender=GenreTitle)
+def genre_title_changed(sender, instance, **kwargs):
+    bump_versions('titles', f'title:{instance.title_id}')
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if not action.startswith('post_'):
+        return
+    title_ids = pk_set or () if reverse else (instance.pk,)
+    bump_versions('titles', *(f'title:{pk}' for pk in title_ids))
+
+
+@receiver((post_save, post_delete), sender=Review)
+def review_changed(sender, instance, **kwargs):
+    # Отзыв меняет рейтинг, который виден и в списке произведений.
+    bump_versions('titles', f'title:{instance.title_id}')
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    bump_versions(f'review:{instance.review_id}')
+
+
+@receiver(post_save, sender=CustomUser)
+def author_saved(sender, instance, created, **kwargs):
+    # Имя автора видно в списках отзывов и комментариев; у нового
+    # пользователя отзывов еще нет.
+    if not created:
+        bump_versions(AUTHORS)
+
+
+@receiver(post_delete, sender=CustomUser)
+def author_deleted(sender, instance, **kwargs):
+    bump_versions(AUTHORS)
@@ -2,7 +2,7 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet)
+                    ReviewViewSet, TitleExportView, TitleViewSet)
 
 app_name = 'api'
 
@@ -18,5 +18,7 @@ router_v1.register(
     CommentViewSet, basename='comment')
 
 urlpatterns = [
+    path('v1/export/titles.jsonl', TitleExportView.as_view(),
+         name='export-titles'),
     path('v1/', include(router_v1.urls)),
 ]
@@ -1,78 +1,164 @@
-from django.db.models import Avg
+from django.conf import settings
+from django.db import IntegrityError
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import (filters, pagination, viewsets)
-
-from reviews.models import Category, Genre, Review, Title
+from rest_framework import (filters, response, serializers, views,
+                            viewsets)
+from rest_framework.decorators import action
+from rest_framework.settings import api_settings
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.utils import normalize_name
+from .cache import AUTHORS
+from .export import titles_jsonl
 from .filters import TitleFilter
-from .mixins import CreateDestroyListViewSet
-from .permissions import (IsAdminOrReadOnly, ReadOnlyOrAuthorOrAdmin)
+from .mixins import (CachedReadMixin, CreateDestroyListViewSet,
+                     ValuesListMixin)
+from .object_cache import category_cache, genre_cache
+from .pagination import CommentPagination, ReviewPagination, TitlePagination
+from .permissions import (IsAdminOrReadOnly, OnlyAdminPermission,
+                          ReadOnlyOrAuthorOrAdmin)
 from .serializers import (CategorySerializer, CommentSerializer,
-                          GenreSerializer,
-                          ReviewSerializer,
-                          TitleCreateSerializer,
-                          TitleSerializer)
+                          CommentValuesSerializer, GenreSerializer,
+                          ReviewSerializer, ReviewValuesSerializer,
+                          TitleCreateSerializer, TitleSerializer,
+                          TitleValuesSerializer)
 
 
 class CategoryViewSet(CreateDestroyListViewSet):
     """Вьюсет для категорий."""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_scopes = ('categories',)
+    object_cache = category_cache
 
 
 class GenreViewSet(CreateDestroyListViewSet):
     """Вьюсет для жанров."""
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_scopes = ('genres',)
+    object_cache = genre_cache
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(CachedReadMixin, ValuesListMixin, viewsets.ModelViewSet):
     """Вьюсет для произведений."""
-    queryset = Title.objects.all().annotate(Avg('reviews__score'))
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     serializer_class = TitleSerializer
-    pagination_class = pagination.PageNumberPagination
+    values_serializer_class = TitleValuesSerializer
+    pagination_class = TitlePagination
     ordering_fields = ('name',)
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
     filterset_fields = ('category', 'genre', 'year', 'name')
     filterset_class = TitleFilter
+    cache_scopes = ('titles',)
+
+    def get_cache_scopes(self):
+        if self.action == 'retrieve':
+            return ('categories', 'genres', f'title:{self.kwargs["pk"]}')
+        return self.cache_scopes
 
     def get_serializer_class(self):
         if self.action == 'create' or self.action == 'partial_update':
             return TitleCreateSerializer
         return TitleSerializer
 
+    @action(detail=False, pagination_class=None)
+    def autocomplete(self, request):
+        """Подсказки по началу названия: только id и имя."""
+        prefix = normalize_name(request.query_params.get('q', ''))
+        if not prefix:
+            return response.Response([])
+        try:
+            limit = min(int(request.query_params['limit']),
+                        settings.TITLE_AUTOCOMPLETE_MAX_LIMIT)
+        except (KeyError, ValueError):
+            limit = settings.TITLE_AUTOCOMPLETE_LIMIT
+        titles = Title.objects.filter(
+            name_normalized__gte=prefix,
+            name_normalized__lt=prefix + chr(0x10FFFF)
+        ).order_by('name_normalized', 'name', 'id')
+        return response.Response(
+            titles.values('id', 'name')[:max(limit, 0)]
+        )
+
+
+class TitleExportView(views.APIView):
+    """Выгрузка всех произведений с отзывами одним потоковым ответом."""
+    permission_classes = (OnlyAdminPermission,)
+
+    def get(self, request):
+        return StreamingHttpResponse(
+            titles_jsonl(settings.TITLE_EXPORT_CHUNK_SIZE),
+            content_type='application/x-ndjson; charset=utf-8'
+        )
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(CachedReadMixin, ValuesListMixin,
+                    viewsets.ModelViewSet):
     """Вьюсет для отзывов."""
     serializer_class = ReviewSerializer
+    values_serializer_class = ReviewValuesSerializer
     permission_classes = (ReadOnlyOrAuthorOrAdmin,)
-    pagination_class = pagination.PageNumberPagination
+    pagination_class = ReviewPagination
+
+    def get_cache_scopes(self):
+        return (AUTHORS, f'title:{self.kwargs.get("title_id")}')
 
     def get_queryset(self):
-        title_id = self.kwargs.get("title_id")
-        new_queryset = get_object_or_404(Title, id=title_id)
-        return new_queryset.reviews.all()
+        # Отзывы ищем сразу с условием на произведение: если произведения
+        # нет, не найдется ни одного отзыва, отдельный запрос не нужен.
+        # Автор нужен проверке прав, его читаем тем же запросом.
+        return Review.objects.filter(
+            title_id=self.kwargs.get("title_id")
+        ).select_related('author')
+
+    def check_empty_list(self):
+        get_object_or_404(Title, id=self.kwargs.get("title_id"))
 
     def perform_create(self, serializer):
         title_id = self.kwargs.get("title_id")
         title = get_object_or_404(Title, id=title_id)
-        serializer.save(author=self.request.user, title=title)
-
-
-class CommentViewSet(viewsets.ModelViewSet):
+        try:
+            serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            # Повторный отзыв отклоняет ограничение unique_author_rewiev:
+            # без предварительной проверки и без гонки между запросами.
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Нельзя оставлять отзыв несколько раз'
+                ]
+            })
+
+
+class CommentViewSet(CachedReadMixin, ValuesListMixin,
+                     viewsets.ModelViewSet):
     """Вьюсет для комментариев."""
     serializer_class = CommentSerializer
-    pagination_class = pagination.PageNumberPagination
+    values_serializer_class = CommentValuesSerializer
+    pagination_class = CommentPagination
     permission_classes = (ReadOnlyOrAuthorOrAdmin,)
 
+    def get_cache_scopes(self):
+        return (AUTHORS, f'title:{self.kwargs.get("title_id")}',
+                f'review:{self.kwargs.get("review_id")}')
+
     def get_queryset(self):
-        review_id = self.kwargs.get("review_id")
-        title__id = self.kwargs.get('title_id')
-        new_queryset = get_object_or_404(
-            Review, id=review_id, title__id=title__id
+        return Comment.objects.filter(
+            review_id=self.kwargs.get("review_id"),
+            review__title_id=self.kwargs.get('title_id')
+        ).select_related('author')
+
+    def check_empty_list(self):
+        get_object_or_404(
+            Review,
+            id=self.kwargs.get("review_id"),
+            title__id=self.kwargs.get('title_id')
         )
-        return new_queryset.comments.all()
 
     def perform_create(self, serializer):
         review_id = self.kwargs.get("review_id")
@@ -88,7 +88,12 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
+    ],
+
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
 
     'DEFAULT_FILTER_BACKENDS': [
@@ -104,9 +109,54 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# 'shared' - кэш, общий для всех процессов сервера: ведра ограничения
+# частоты запросов и объекты ObjectCache. В продакшене лучше Redis
+# или Memcached, файловый бэкенд работает без отдельного сервиса.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'shared-cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+API_RESPONSE_CACHE_TIMEOUT = 5 * 60
+
+OBJECT_CACHE_SIZE = 1024
+OBJECT_CACHE_TIMEOUT = 60 * 60
+OBJECT_CACHE_LOCAL_TIMEOUT = 5
+
+# Сколько секунд пользователь, найденный по JWT, хранится в кэше.
+USER_CACHE_TIMEOUT = 60
+
+# Выдавать токены с ролью, флагом суперпользователя и именем: запросы
+# на чтение проверяют права по ним, не загружая пользователя.
+JWT_ROLE_CLAIMS = False
+
+# Сколько проверенных токенов хранится в памяти процесса, 0 - не хранить.
+JWT_TOKEN_CACHE_SIZE = 10000
+
+# Ограничение частоты запросов к signup и token (users.throttling):
+# burst запросов подряд, дальше со скоростью rate ('число/s|m|h|d').
+# rate = None отключает ведро.
+THROTTLE_BUCKETS = {
+    'auth_ip': {'rate': '20/m', 'burst': 20},
+    'auth_username': {'rate': '5/m', 'burst': 5},
+}
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'confirmation-emails')
 
+# Очередь писем (send_outbox): число попыток, пауза перед первым
+# повтором (дальше удваивается) и сколько секунд письмо, взятое
+# в отправку, не выдается другим обработчикам.
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
+EMAIL_OUTBOX_LEASE = 5 * 60
+
 
 LANGUAGE_CODE = 'ru'
 
@@ -129,3 +179,9 @@ MAX_SCORE_VALUE = 10
 ADMIN_EMAIL = 'admin@yamdb.com'
 CONFIRMATION_CODE_LENGTH = 16
 NOT_ALLOWED_USERNAME = 'me'
+
+TITLE_AUTOCOMPLETE_LIMIT = 10
+TITLE_AUTOCOMPLETE_MAX_LIMIT = 50
+
+# Сколько произведений выгрузки читается из базы одной пачкой.
+TITLE_EXPORT_CHUNK_SIZE = 500
@@ -0,0 +1,196 @@
+import csv
+import gzip
+import os
+from datetime import datetime
+from itertools import count
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from reviews.management.commands.import_data import (OPENERS, TABLES,
+                                                     find_file, shard_name)
+
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_SHARD_SIZE = 1000000
+
+# Колонки CSV и поля модели, из которых они берутся, - в том же
+# виде, в каком их читает import_data.
+COLUMNS = {
+    'users.csv': (
+        ('id', 'id'), ('username', 'username'), ('email', 'email'),
+        ('role', 'role'), ('bio', 'bio'), ('first_name', 'first_name'),
+        ('last_name', 'last_name'),
+    ),
+    'category.csv': (('id', 'id'), ('name', 'name'), ('slug', 'slug')),
+    'genre.csv': (('id', 'id'), ('name', 'name'), ('slug', 'slug')),
+    'titles.csv': (
+        ('id', 'id'), ('name', 'name'), ('year', 'year'),
+        ('category', 'category_id'), ('description', 'description'),
+    ),
+    'genre_title.csv': (
+        ('id', 'id'), ('title_id', 'title_id'), ('genre_id', 'genre_id'),
+    ),
+    'review.csv': (
+        ('id', 'id'), ('title_id', 'title_id'), ('text', 'text'),
+        ('author', 'author_id'), ('score', 'score'),
+        ('pub_date', 'pub_date'),
+    ),
+    'comments.csv': (
+        ('id', 'id'), ('review_id', 'review_id'), ('text', 'text'),
+        ('author', 'author_id'), ('pub_date', 'pub_date'),
+    ),
+}
+
+
+def format_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat().replace('+00:00', 'Z')
+    return value
+
+
+def remove_table_files(target, filename):
+    """Удаляем файлы прошлой выгрузки таблицы, в том числе ее части."""
+    names = [filename]
+    for number in count(1):
+        if find_file(target, shard_name(filename, number)) is None:
+            break
+        names.append(shard_name(filename, number))
+    for name in names:
+        for suffix, _ in OPENERS:
+            path = os.path.join(target, name + suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class ShardedWriter:
+    """
+    CSV таблицы, разбитый на части не больше shard_size строк.
+    Пока часть одна, файл называется как таблица; при открытии
+    второй части первая переименовывается в name-0001.csv.
+    """
+
+    def __init__(self, target, filename, header, shard_size=0,
+                 compress=False):
+        self.target = target
+        self.filename = filename
+        self.header = header
+        self.shard_size = shard_size
+        self.suffix = '.gz' if compress else ''
+        self.paths = []
+        self.file = None
+        self.open_shard()
+
+    def path(self, name):
+        return os.path.join(self.target, name + self.suffix)
+
+    def open_shard(self):
+        if self.file is not None:
+            self.file.close()
+        if len(self.paths) == 1:
+            first = self.path(shard_name(self.filename, 1))
+            os.replace(self.paths[0], first)
+            self.paths[0] = first
+        if self.paths:
+            path = self.path(shard_name(self.filename, len(self.paths) + 1))
+        else:
+            path = self.path(self.filename)
+        opener = gzip.open if self.suffix else open
+        self.file = opener(path, 'wt', encoding='utf-8', newline='')
+        self.paths.append(path)
+        self.writer = csv.writer(self.file, lineterminator='\n')
+        self.writer.writerow(self.header)
+        self.rows = 0
+
+    def writerow(self, row):
+        if self.shard_size and self.rows >= self.shard_size:
+            self.open_shard()
+        self.writer.writerow(row)
+        self.rows += 1
+
+    def close(self):
+        self.file.close()
+
+
+def start_snapshot():
+    """
+    Все запросы транзакции видят один снимок данных. В SQLite это
+    так и есть для читающей транзакции, в PostgreSQL нужен
+    уровень изоляции REPEATABLE READ.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ'
+            )
+
+
+def export_table(model, filename, target, chunk_size=DEFAULT_CHUNK_SIZE,
+                 shard_size=DEFAULT_SHARD_SIZE, compress=False):
+    """
+    Выгружаем таблицу в CSV одним запросом с потоковым чтением
+    курсора по chunk_size строк: память не зависит от размера таблицы.
+    Возвращаем число строк и пути записанных файлов.
+    """
+    columns = COLUMNS[filename]
+    remove_table_files(target, filename)
+    writer = ShardedWriter(
+        target, filename, [column for column, _ in columns],
+        shard_size, compress
+    )
+    exported = 0
+    try:
+        with transaction.atomic():
+            start_snapshot()
+            rows = model.objects.order_by('pk').values_list(
+                *(attname for _, attname in columns)
+            ).iterator(chunk_size=chunk_size)
+            for values in rows:
+                writer.writerow([format_value(value) for value in values])
+                exported += 1
+    finally:
+        writer.close()
+    return exported, writer.paths
+
+
+class Command(BaseCommand):
+    help = "Выгружаем данные в CSV файлы в формате import_data"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'target', help='Папка, куда записать CSV файлы'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк, читаемых из базы за раз'
+        )
+        parser.add_argument(
+            '--shard-size', type=int, default=DEFAULT_SHARD_SIZE,
+            help='Максимум строк в одном файле, 0 - не разбивать таблицы'
+        )
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Сжимать файлы gzip'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должно быть не меньше 1')
+        if options['shard_size'] < 0:
+            raise CommandError('--shard-size не может быть отрицательным')
+        target = options['target']
+        os.makedirs(target, exist_ok=True)
+        for model, filename, _ in TABLES:
+            start = perf_counter()
+            exported, paths = export_table(
+                model, filename, target, options['chunk_size'],
+                options['shard_size'], options['gzip']
+            )
+            elapsed = perf_counter() - start
+            self.stdout.write(
+                f'{model.__name__}: выгружено {exported} за {elapsed:.2f} с '
+                f'({exported / elapsed if elapsed else 0:.0f} строк/с), '
+                f'файлов {len(paths)}'
+            )
+        self.stdout.write(self.style.SUCCESS('Данные выгружены успешно'))
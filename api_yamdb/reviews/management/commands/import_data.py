@@ -1,159 +1,482 @@
+import bz2
 import csv
+import gzip
+import json
+import lzma
+import os
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from functools import partial
+from itertools import chain, count, islice
+from time import perf_counter
 
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from api.cache import ALL_RESPONSES, bump_versions
+from api.object_cache import category_cache, genre_cache
+from reviews.management.commands.recalculate_ratings import (
+    recalculate_ratings
+)
+from reviews.management.parsers import (parse_category, parse_chunk,
+                                        parse_comment, parse_genre,
+                                        parse_genre_title, parse_review,
+                                        parse_title, parse_user)
 from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.authentication import invalidate_user
 from users.models import CustomUser
 
-DICT = {
-    Category: 'category.csv',
-    Genre: 'genre.csv',
-    GenreTitle: 'genre_title.csv',
-    Title: 'titles.csv',
-    Comment: 'comments.csv',
-    Review: 'review.csv',
-    CustomUser: 'users.csv'
-}
-
-
-def category_import():
-    if Category.objects.exists():
-        print('Данные для Category уже загружены')
-    else:
-        with open(
-            f'{settings.BASE_DIR}/static/data/category.csv',
-            'r', encoding='utf-8'
-        ) as csv_file:
-            reader = csv.DictReader(csv_file)
-            for row in reader:
-                Category.objects.create(
-                    id=row['id'],
-                    name=row['name'],
-                    slug=row['slug'],
-                )
+DEFAULT_BATCH_SIZE = 5000
+LOOKUP_CHUNK_SIZE = 500
 
+# Порядок важен: таблицы загружаются после тех, на которые ссылаются.
+TABLES = (
+    (CustomUser, 'users.csv', parse_user),
+    (Category, 'category.csv', parse_category),
+    (Genre, 'genre.csv', parse_genre),
+    (Title, 'titles.csv', parse_title),
+    (GenreTitle, 'genre_title.csv', parse_genre_title),
+    (Review, 'review.csv', parse_review),
+    (Comment, 'comments.csv', parse_comment),
+)
 
-def genre_import():
-    if Genre.objects.exists():
-        print('Данные для Genre уже загружены')
-    else:
-        with open(
-            f'{settings.BASE_DIR}/static/data/genre.csv',
-            'r', encoding='utf-8'
-        ) as csv_file:
-            reader = csv.DictReader(csv_file)
-            for row in reader:
-                Genre.objects.create(
-                    id=row['id'],
-                    name=row['name'],
-                    slug=row['slug'],
-                )
+# Сжатые выгрузки распаковываются на лету, по расширению файла.
+OPENERS = (
+    ('', open),
+    ('.gz', gzip.open),
+    ('.bz2', bz2.open),
+    ('.xz', lzma.open),
+)
 
 
-def genre_title_import():
-    if GenreTitle.objects.exists():
-        print('Данные для GenreTitle уже загружены')
-    else:
-        with open(
-            f'{settings.BASE_DIR}/static/data/genre_title.csv',
-            'r', encoding='utf-8'
-        ) as csv_file:
-            reader = csv.DictReader(csv_file)
-            for row in reader:
-                GenreTitle.objects.create(
-                    id=row['id'],
-                    title_id=row['title_id'],
-                    genre_id=row['genre_id'],
-                )
+class IdSets(dict):
+    """Первичные ключи уже загруженных объектов, читаются один раз."""
 
+    def __missing__(self, model):
+        ids = set(model.objects.values_list('pk', flat=True).iterator())
+        self[model] = ids
+        return ids
 
-def title_import():
-    if Title.objects.exists():
-        print('Данные для Title уже загружены')
-    else:
-        with open(
-            f'{settings.BASE_DIR}/static/data/titles.csv',
-            'r', encoding='utf-8'
-        ) as csv_file:
-            reader = csv.DictReader(csv_file)
-            for row in reader:
-                Title.objects.create(
-                    id=row['id'],
-                    name=row['name'],
-                    year=row['year'],
-                    category=Category.objects.get(id=row['category']),
-                )
 
+def foreign_keys(model):
+    return [
+        (field.attname, field.related_model, field.null)
+        for field in model._meta.concrete_fields
+        if field.many_to_one
+    ]
 
-def comments_import():
-    if Comment.objects.exists():
-        print('Данные для Comment уже загружены')
-    else:
-        with open(
-            f'{settings.BASE_DIR}/static/data/comments.csv',
-            'r', encoding='utf-8'
-        ) as csv_file:
-            reader = csv.DictReader(csv_file)
-            for row in reader:
-                Comment.objects.create(
-                    id=row['id'],
-                    review_id=row['review_id'],
-                    text=row['text'],
-                    author=CustomUser.objects.get(id=row['author']),
-                    pub_date=row['pub_date'],
-                )
+
+def check_foreign_keys(values, fields, ids):
+    """
+    Ссылку на несуществующий объект обнуляем, если поле допускает NULL,
+    иначе строку пропускаем.
+    """
+    for attname, related_model, null in fields:
+        value = values[attname]
+        if value is None or value in ids[related_model]:
+            continue
+        if not null:
+            return False
+        values[attname] = None
+    return True
+
+
+def default_source():
+    return os.path.join(settings.BASE_DIR, 'static', 'data')
+
+
+def shard_name(filename, number):
+    """Имя части большой таблицы: review.csv -> review-0001.csv."""
+    stem, extension = os.path.splitext(filename)
+    return f'{stem}-{number:04d}{extension}'
+
+
+def find_file(source, filename):
+    """Путь и функция открытия CSV или его сжатой версии (.gz, .bz2, .xz)."""
+    for suffix, opener in OPENERS:
+        path = os.path.join(source, filename + suffix)
+        if os.path.exists(path):
+            return path, opener
+    return None
+
+
+def source_files(source, filename):
+    """
+    Файлы таблицы: сам CSV или, если его нет, части
+    name-0001.csv, name-0002.csv... по порядку.
+    """
+    found = find_file(source, filename)
+    if found is not None:
+        return [found]
+    files = []
+    for number in count(1):
+        found = find_file(source, shard_name(filename, number))
+        if found is None:
+            break
+        files.append(found)
+    if not files:
+        raise CommandError(f'Файл {filename} не найден в {source}')
+    return files
+
+
+def read_file(path, opener, skip_header=False):
+    with opener(path, 'rt', encoding='utf-8', newline='') as csv_file:
+        reader = csv.reader(csv_file)
+        if skip_header:
+            next(reader, None)
+        yield from reader
+
+
+def read_chunks(source, filename, size, skip=0):
+    """
+    Построчно читаем CSV (все его части подряд) и отдаем заголовок
+    и пачки сырых строк, пропустив первые skip строк данных.
+    """
+    first, *rest = source_files(source, filename)
+    reader = chain(
+        read_file(*first),
+        *(read_file(*found, skip_header=True) for found in rest)
+    )
+    header = next(reader, [])
+    next(islice(reader, skip, skip), None)
+    chunk = list(islice(reader, size))
+    while chunk:
+        yield header, chunk
+        chunk = list(islice(reader, size))
+
+
+def ordered_map(executor, function, iterable, prefetch):
+    """
+    Как executor.map, но держит в работе не больше prefetch задач,
+    чтобы чтение большого файла не опережало запись в базу.
+    """
+    pending = deque()
+    for args in iterable:
+        pending.append(executor.submit(function, *args))
+        if len(pending) >= prefetch:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def diff_fields(model, values):
+    """Поля строки, которые сравниваем и обновляем: без pk и auto_now."""
+    return [
+        name for name in values
+        if name != model._meta.pk.attname
+        and not getattr(model._meta.get_field(name), 'auto_now', False)
+    ]
+
+
+@contextmanager
+def keep_creation_dates(model, values):
+    """
+    Даты auto_now_add (например, pub_date), которые есть в CSV,
+    сохраняем как есть: иначе bulk_create заменит их временем импорта.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False) and field.attname in values
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
 
 
-def review_import():
-    if Review.objects.exists():
-        print('Данные для Review уже загружены')
-    else:
-        with open(
-            f'{settings.BASE_DIR}/static/data/review.csv',
-            'r', encoding='utf-8'
-        ) as csv_file:
-            reader = csv.DictReader(csv_file)
-            for row in reader:
-                Review.objects.create(
-                    id=row['id'],
-                    title_id=row['title_id'],
-                    text=row['text'],
-                    author=CustomUser.objects.get(id=row['author']),
-                    score=row['score'],
-                    pub_date=row['pub_date'],
+def fetch_existing(model, pks, fields):
+    """Текущие значения полей по первичным ключам, запросами по частям."""
+    existing = {}
+    for start in range(0, len(pks), LOOKUP_CHUNK_SIZE):
+        rows = model.objects.filter(
+            pk__in=pks[start:start + LOOKUP_CHUNK_SIZE]
+        ).order_by().values('pk', *fields)
+        for row in rows:
+            existing[row.pop('pk')] = row
+    return existing
+
+
+def claim_fields(model, fields):
+    """Поля строки, смена которых отзывает токены пользователя."""
+    return [name for name in getattr(model, 'claim_fields', ())
+            if name in fields]
+
+
+def upsert_batch(model, rows):
+    """
+    Новые строки вставляем, существующие обновляем,
+    только если значения полей изменились.
+    Если у пользователя изменилась роль (CustomUser.claim_fields),
+    увеличиваем поколение его токенов, как это делает CustomUser.save().
+    """
+    if not rows:
+        return 0, 0
+    fields = diff_fields(model, rows[0])
+    claims = claim_fields(model, fields)
+    update_fields = fields + ['token_generation'] if claims else fields
+    pk_name = model._meta.pk.attname
+    existing = fetch_existing(
+        model, [values[pk_name] for values in rows], update_fields
+    )
+    new, changed = [], []
+    for values in rows:
+        current = existing.get(values[pk_name])
+        if current is None:
+            new.append(model(**values))
+        elif any(current[name] != values[name] for name in fields):
+            if claims:
+                revoked = any(
+                    current[name] != values[name] for name in claims
+                )
+                values['token_generation'] = (
+                    current['token_generation'] + revoked
                 )
+            changed.append(model(**values))
+    model.objects.bulk_create(new)
+    if changed:
+        model.objects.bulk_update(changed, update_fields)
+    if claims:
+        # bulk_update не отправляет сигналы: сбрасываем кэш пользователей
+        # после фиксации транзакции, чтобы его не заполнили старыми данными.
+        for obj in changed:
+            transaction.on_commit(partial(invalidate_user, obj.pk))
+    return len(new), len(changed)
+
+
+def delete_missing(model, existing_pks, seen_pks):
+    """Удаляем объекты, которых больше нет в выгрузке."""
+    missing = sorted(existing_pks - seen_pks)
+    for start in range(0, len(missing), LOOKUP_CHUNK_SIZE):
+        model.objects.filter(
+            pk__in=missing[start:start + LOOKUP_CHUNK_SIZE]
+        ).delete()
+    return len(missing)
+
+
+class Checkpoint:
+    """
+    Контрольная точка импорта в JSON-файле: для каждой таблицы - число
+    строк CSV, уже записанных в базу, и признак полной загрузки.
+    Без пути файла ничего не сохраняет.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.state = {}
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as checkpoint_file:
+                self.state = json.load(checkpoint_file)
+
+    def __bool__(self):
+        return bool(self.path)
+
+    def rows(self, table):
+        return self.state.get(table, {}).get('rows', 0)
 
+    def is_started(self, table):
+        return table in self.state
 
-def users_import():
-    if CustomUser.objects.exists():
-        print('Данные для CustomUser уже загружены')
-    else:
-        with open(
-            f'{settings.BASE_DIR}/static/data/users.csv',
-            'r', encoding='utf-8'
-        ) as csv_file:
-            reader = csv.DictReader(csv_file)
-            for row in reader:
-                CustomUser.objects.create(
-                    id=row['id'],
-                    username=row['username'],
-                    email=row['email'],
-                    role=row['role'],
-                    bio=row['bio'],
-                    first_name=row['first_name'],
-                    last_name=row['last_name'],
+    def is_done(self, table):
+        return self.state.get(table, {}).get('done', False)
+
+    def save(self, table, rows, done=False):
+        if not self.path:
+            return
+        self.state[table] = {'rows': rows, 'done': done}
+        # Пишем во временный файл и подменяем: прерывание не оставит
+        # наполовину записанную контрольную точку.
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump(self.state, checkpoint_file)
+        os.replace(temp_path, self.path)
+
+    def remove(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def parse_chunks(source, filename, parse, batch_size, executor, prefetch,
+                 skip=0):
+    chunks = read_chunks(source, filename, batch_size, skip)
+    parse_rows = partial(parse_chunk, parse)
+    if executor is None:
+        return (parse_rows(*chunk) for chunk in chunks)
+    return ordered_map(executor, parse_rows, chunks, prefetch)
+
+
+def import_batch(model, rows, fields, ids, upsert, ignore_conflicts=False):
+    """
+    Записываем пачку; возвращаем вставленные, обновленные, пропущенные.
+    С ignore_conflicts строки с уже существующим ключом не вставляются.
+    """
+    valid = [
+        values for values in rows
+        if check_foreign_keys(values, fields, ids)
+    ]
+    with keep_creation_dates(model, valid[0] if valid else {}):
+        if upsert:
+            inserted, updated = upsert_batch(model, valid)
+        else:
+            model.objects.bulk_create(
+                [model(**values) for values in valid],
+                ignore_conflicts=ignore_conflicts
+            )
+            inserted, updated = len(valid), 0
+    return inserted, updated, len(rows) - len(valid)
+
+
+def bulk_import(model, filename, parse, ids, batch_size, executor=None,
+                prefetch=2, upsert=False, delete=False, source=None,
+                checkpoint=None):
+    """
+    Загружаем таблицу пачками: строки разбираются в процессах пула
+    (если он есть), в базу пишет только этот процесс.
+    В режиме upsert сравниваем строки с базой по первичному ключу.
+    Без контрольной точки вся таблица пишется в одной транзакции,
+    с ней - каждая пачка в своей, и после фиксации пачки
+    в контрольную точку записывается число обработанных строк;
+    при повторном запуске эти строки пропускаются.
+    Возвращаем счетчики вставленных, обновленных, удаленных
+    и пропущенных строк.
+    """
+    source = source or default_source()
+    checkpoint = checkpoint or Checkpoint()
+    name = model.__name__
+    fields = foreign_keys(model)
+    stats = Counter()
+    seen_pks = set()
+    done_rows = checkpoint.rows(name)
+    # Процесс могли прервать после фиксации пачки, но до записи
+    # контрольной точки: первую пачку после возобновления вставляем,
+    # пропуская уже загруженные строки. Начало таблицы отмечаем до первой
+    # пачки, чтобы возобновление отличало ее от загруженной раньше.
+    resumed = checkpoint.is_started(name)
+    if not resumed:
+        checkpoint.save(name, done_rows)
+    with nullcontext() if checkpoint else transaction.atomic():
+        for rows, invalid in parse_chunks(
+            source, filename, parse, batch_size, executor, prefetch,
+            done_rows
+        ):
+            seen_pks.update(values['id'] for values in rows)
+            # Внутри общей транзакции таблицы точка сохранения не нужна.
+            with transaction.atomic(savepoint=False):
+                inserted, updated, skipped = import_batch(
+                    model, rows, fields, ids, upsert, resumed
                 )
+            resumed = False
+            stats['inserted'] += inserted
+            stats['updated'] += updated
+            stats['skipped'] += invalid + skipped
+            done_rows += len(rows) + invalid
+            checkpoint.save(name, done_rows)
+        if delete:
+            stats['deleted'] = delete_missing(model, ids[model], seen_pks)
+    checkpoint.save(name, done_rows, done=True)
+    ids.pop(model, None)
+    return stats
 
 
 class Command(BaseCommand):
     help = "Импортируем данные из CSV файлов в вашу модель"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одной пачке вставки'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Количество процессов для разбора и проверки CSV'
+        )
+        parser.add_argument(
+            '--upsert', action='store_true',
+            help='Обновить уже загруженные таблицы: вставить новые строки '
+                 'и изменить только отличающиеся'
+        )
+        parser.add_argument(
+            '--delete-missing', action='store_true',
+            help='Вместе с --upsert удалить объекты, которых нет в CSV'
+        )
+        parser.add_argument(
+            '--source', default=None,
+            help='Папка с CSV файлами (можно сжатыми .gz, .bz2, .xz), '
+                 'по умолчанию static/data'
+        )
+        parser.add_argument(
+            '--checkpoint', default=None,
+            help='Файл контрольной точки: пачки фиксируются по одной, '
+                 'прерванный импорт продолжится с последней записанной'
+        )
+
     def handle(self, *args, **options):
-        users_import()
-        genre_import()
-        category_import()
-        title_import()
-        genre_title_import()
-        review_import()
-        comments_import()
+        if options['workers'] < 1:
+            raise CommandError('--workers должно быть не меньше 1')
+        if options['delete_missing'] and not options['upsert']:
+            raise CommandError('--delete-missing работает только с --upsert')
+        if options['delete_missing'] and options['checkpoint']:
+            raise CommandError(
+                '--delete-missing нельзя сочетать с --checkpoint: '
+                'после возобновления неизвестны строки прошлых запусков'
+            )
+        options['source'] = options['source'] or default_source()
+        if not os.path.isdir(options['source']):
+            raise CommandError(f'Папка {options["source"]} не найдена')
+        checkpoint = Checkpoint(options['checkpoint'])
+        executor = None
+        if options['workers'] > 1:
+            executor = ProcessPoolExecutor(options['workers'])
+        try:
+            self.import_tables(executor, checkpoint, options)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        checkpoint.remove()
+        recalculate_ratings()
+        # Объекты создавались без сигналов, поэтому сбрасываем кэш ответов
+        # и категорий с жанрами; остальные записи общего кэша не трогаем.
+        bump_versions(ALL_RESPONSES)
+        category_cache.invalidate()
+        genre_cache.invalidate()
         self.stdout.write(self.style.SUCCESS('Данные импортированы успешно'))
+
+    def import_tables(self, executor, checkpoint, options):
+        ids = IdSets()
+        for model, filename, parse in TABLES:
+            name = model.__name__
+            if checkpoint.is_done(name):
+                self.stdout.write(
+                    f'Данные для {name} уже загружены (контрольная точка)'
+                )
+                continue
+            if (not options['upsert'] and not checkpoint.is_started(name)
+                    and model.objects.exists()):
+                self.stdout.write(f'Данные для {name} уже загружены')
+                continue
+            start = perf_counter()
+            stats = bulk_import(
+                model, filename, parse, ids, options['batch_size'],
+                executor, options['workers'] * 2,
+                options['upsert'], options['delete_missing'],
+                options['source'], checkpoint
+            )
+            self.report(name, stats, perf_counter() - start)
+
+    def report(self, name, stats, elapsed):
+        processed = stats['inserted'] + stats['updated']
+        details = ', '.join(
+            f'{label} {stats[key]}'
+            for key, label in (('updated', 'обновлено'),
+                               ('deleted', 'удалено'),
+                               ('skipped', 'пропущено'))
+            if stats[key]
+        )
+        self.stdout.write(
+            f'{name}: вставлено {stats["inserted"]} за {elapsed:.2f} с '
+            f'({processed / elapsed if elapsed else 0:.0f} строк/с)'
+            + (f', {details}' if details else '')
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from reviews.search import install_search_index
+
+
+class Command(BaseCommand):
+    help = "Перестраиваем полнотекстовый индекс произведений"
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError(
+                'Полнотекстовый индекс FTS5 доступен только для SQLite'
+            )
+        with connection.cursor() as cursor:
+            install_search_index(cursor)
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс перестроен'))
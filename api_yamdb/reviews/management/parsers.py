@@ -0,0 +1,110 @@
+"""
+Разбор и проверка строк CSV для import_data.
+Модуль не обращается к базе и не импортирует модели, поэтому
+функции можно выполнять в отдельных процессах.
+"""
+from django.utils.dateparse import parse_datetime
+
+from reviews.utils import normalize_name
+
+ROLES = ('user', 'moderator', 'admin')
+
+
+def required(value):
+    if not value:
+        raise ValueError('Пустое обязательное поле')
+    return value
+
+
+def score(value):
+    value = int(value)
+    if not 1 <= value <= 10:
+        raise ValueError('Оценка вне диапазона 1..10')
+    return value
+
+
+def date_time(value):
+    value = parse_datetime(value)
+    if value is None:
+        raise ValueError('Некорректная дата')
+    return value
+
+
+def parse_user(row):
+    if row['role'] not in ROLES:
+        raise ValueError('Неизвестная роль')
+    return {
+        'id': int(row['id']),
+        'username': required(row['username']),
+        'email': required(row['email']),
+        'role': row['role'],
+        'bio': row['bio'],
+        'first_name': row['first_name'],
+        'last_name': row['last_name'],
+    }
+
+
+def parse_category(row):
+    return {
+        'id': int(row['id']),
+        'name': required(row['name']),
+        'slug': required(row['slug']),
+    }
+
+
+parse_genre = parse_category
+
+
+def parse_title(row):
+    return {
+        'id': int(row['id']),
+        'name': required(row['name']),
+        'name_normalized': normalize_name(row['name']),
+        'year': int(row['year']),
+        'description': row.get('description', ''),
+        'category_id': int(row['category']) if row['category'] else None,
+    }
+
+
+def parse_genre_title(row):
+    return {
+        'id': int(row['id']),
+        'title_id': int(row['title_id']),
+        'genre_id': int(row['genre_id']),
+    }
+
+
+def parse_review(row):
+    return {
+        'id': int(row['id']),
+        'title_id': int(row['title_id']),
+        'text': required(row['text']),
+        'author_id': int(row['author']),
+        'score': score(row['score']),
+        'pub_date': date_time(row['pub_date']),
+    }
+
+
+def parse_comment(row):
+    return {
+        'id': int(row['id']),
+        'review_id': int(row['review_id']),
+        'text': required(row['text']),
+        'author_id': int(row['author']),
+        'pub_date': date_time(row['pub_date']),
+    }
+
+
+def parse_chunk(parse, header, rows):
+    """
+    Разбираем пачку сырых строк CSV.
+    Возвращаем значения полей корректных строк и число отброшенных.
+    """
+    parsed = []
+    invalid = 0
+    for row in rows:
+        try:
+            parsed.append(parse(dict(zip(header, row))))
+        except (KeyError, TypeError, ValueError):
+            invalid += 1
+    return parsed, invalid
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from reviews.search import drop_search_index, install_search_index
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            install_search_index(cursor)
+
+
+def drop(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            drop_search_index(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_comment_ordering'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, drop),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations, models
+
+from reviews.search import install_search_index
+
+
+def fill_name_normalized(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    titles = list(Title.objects.only('id', 'name'))
+    for title in titles:
+        title.name_normalized = ' '.join(title.name.casefold().split())
+    Title.objects.bulk_update(titles, ('name_normalized',), batch_size=500)
+
+
+def reinstall_search_index(apps, schema_editor):
+    # Добавление поля пересоздает таблицу в SQLite вместе с триггерами.
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            install_search_index(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_title_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='name_normalized',
+            field=models.CharField(default='', editable=False, max_length=256, verbose_name='Нормализованное имя'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(
+            reinstall_search_index, migrations.RunPython.noop
+        ),
+        migrations.RunPython(fill_name_normalized, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['name_normalized', 'name'], name='title_name_prefix_idx'),
+        ),
+    ]
@@ -1,8 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db.models import UniqueConstraint
+from django.db.models import F, UniqueConstraint
 from api.validators import validate_slug
 from api_yamdb.settings import AUTH_USER_MODEL
+from .utils import normalize_name
 
 
 class CustomBaseModel(models.Model):
@@ -47,6 +48,11 @@ class Genre(CustomBaseModel):
 class Title(models.Model):
     """Модель для жанров."""
     name = models.TextField(max_length=256, verbose_name='Имя')
+    name_normalized = models.CharField(
+        max_length=256,
+        editable=False,
+        verbose_name='Нормализованное имя'
+    )
     year = models.IntegerField(verbose_name='Год')
     description = models.TextField(blank=True, verbose_name='Описание')
     genre = models.ManyToManyField(
@@ -63,15 +69,59 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Категория'
     )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок'
+    )
+    score_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество оценок'
+    )
 
     class Meta:
         ordering = ('name',)
+        indexes = [
+            models.Index(
+                fields=('name_normalized', 'name'),
+                name='title_name_prefix_idx'
+            ),
+            models.Index(fields=('name', 'id'), name='title_name_idx'),
+            models.Index(
+                fields=('category', 'name'),
+                name='title_category_name_idx'
+            ),
+            models.Index(
+                fields=('category', 'year', 'name'),
+                name='title_category_year_idx'
+            ),
+        ]
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
 
     def __str__(self):
         return {self.name}
 
+    def save(self, *args, **kwargs):
+        self.name_normalized = normalize_name(self.name)
+        super().save(*args, **kwargs)
+
+    @property
+    def rating(self):
+        """Средняя оценка по сохраненным сумме и количеству оценок."""
+        if not self.score_count:
+            return None
+        return self.score_sum / self.score_count
+
+    @classmethod
+    def change_score(cls, title_id, score_delta, count_delta=0):
+        """Атомарно изменяем сумму и количество оценок произведения."""
+        cls.objects.filter(pk=title_id).update(
+            score_sum=F('score_sum') + score_delta,
+            score_count=F('score_count') + count_delta
+        )
+
 
 class GenreTitle(models.Model):
     """Модель для связи жанров и произведений."""
@@ -85,6 +135,14 @@ class GenreTitle(models.Model):
         verbose_name='Произведение'
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=('genre', 'title'),
+                name='genretitle_genre_title_idx'
+            ),
+        ]
+
     def __str__(self):
         return f'{self.genre}, {self.title}'
 
@@ -120,12 +178,24 @@ class Review(models.Model):
                 name='unique_author_rewiev'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=('title', '-pub_date', 'id'),
+                name='review_title_pub_date_idx'
+            ),
+        ]
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
 
     def __str__(self):
         return self.text
 
+    def save(self, *args, **kwargs):
+        # Рейтинг произведения меняют сигналы reviews.signals в той же
+        # транзакции, что и сам отзыв.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Модель для комментариев."""
@@ -147,5 +217,12 @@ class Comment(models.Model):
     )
 
     class Meta:
+        ordering = ('pub_date',)
+        indexes = [
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx'
+            ),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
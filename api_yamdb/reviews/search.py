@@ -0,0 +1,51 @@
+"""Полнотекстовый индекс FTS5 для произведений (только SQLite)."""
+
+SEARCH_TABLE = 'reviews_title_fts'
+
+CREATE_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_title_fts USING fts5("
+    "name, description, content='reviews_title', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+
+CREATE_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS reviews_title_fts_ai "
+    "AFTER INSERT ON reviews_title BEGIN "
+    "INSERT INTO reviews_title_fts(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_title_fts_ad "
+    "AFTER DELETE ON reviews_title BEGIN "
+    "INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name, "
+    "description) VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_title_fts_au "
+    "AFTER UPDATE OF name, description ON reviews_title BEGIN "
+    "INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name, "
+    "description) VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO reviews_title_fts(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+)
+
+REBUILD = "INSERT INTO reviews_title_fts(reviews_title_fts) VALUES ('rebuild')"
+
+DROP = (
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ai',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ad',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_au',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+)
+
+
+def install_search_index(cursor):
+    """
+    Создаем индекс и триггеры, если их нет, и заполняем индекс заново.
+    SQLite удаляет триггеры вместе с таблицей, поэтому после миграций,
+    пересоздающих reviews_title, индекс нужно установить повторно.
+    """
+    for statement in (CREATE_TABLE, *CREATE_TRIGGERS, REBUILD):
+        cursor.execute(statement)
+
+
+def drop_search_index(cursor):
+    """Удаляем индекс и триггеры."""
+    for statement in DROP:
+        cursor.execute(statement)
@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Review, Title
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_score(sender, instance, raw, **kwargs):
+    """
+    Перед изменением отзыва читаем его прежние произведение и оценку
+    с блокировкой строки: Review.save() выполняется в транзакции, так что
+    одновременные изменения одного отзыва учитываются по очереди.
+    """
+    instance._previous_score = None
+    if raw or instance._state.adding:
+        return
+    instance._previous_score = Review.objects.select_for_update().filter(
+        pk=instance.pk
+    ).values_list('title_id', 'score').first()
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_score', None)
+    if previous is None:
+        Title.change_score(instance.title_id, instance.score, 1)
+        return
+    title_id, score = previous
+    if title_id != instance.title_id:
+        Title.change_score(title_id, -score, -1)
+        Title.change_score(instance.title_id, instance.score, 1)
+    elif score != instance.score:
+        Title.change_score(title_id, instance.score - score)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    # Срабатывает и при каскадном удалении: произведения, автора.
+    Title.change_score(instance.title_id, -instance.score, -1)
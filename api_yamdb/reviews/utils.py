@@ -0,0 +1,3 @@
+def normalize_name(name):
+    """Приводим название к виду для поиска по префиксу."""
+    return ' '.join(name.casefold().split())
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import CustomUser
+from .models import CustomUser, OutboxEmail
 
 
 class CustomUserAdmin(admin.ModelAdmin):
@@ -20,3 +20,13 @@ class CustomUserAdmin(admin.ModelAdmin):
 
 
 admin.site.register(CustomUser, CustomUserAdmin)
+
+
+class OutboxEmailAdmin(admin.ModelAdmin):
+
+    list_display = ('to', 'subject', 'attempts', 'next_attempt')
+    search_fields = ('to',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
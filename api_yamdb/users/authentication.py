@@ -0,0 +1,199 @@
+import threading
+from collections import OrderedDict
+from hashlib import sha256
+from time import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import CustomUser, RoleTokenUser
+
+USER_KEY = 'users:user:{}'
+# Секреты пользователя в общий кэш не попадают.
+SECRET_FIELDS = ('password', 'confirmation_code')
+GENERATION_KEY = 'users:token_generation:{}'
+GENERATION_CLAIM = 'token_generation'
+
+
+def invalidate_user(user_id):
+    """Сбрасываем кэшированного пользователя после изменения или удаления."""
+    cache.delete_many(
+        (USER_KEY.format(user_id), GENERATION_KEY.format(user_id))
+    )
+
+
+def get_cached_user(user_id):
+    """
+    Активный пользователь по id из кэша или из базы, только для чтения:
+    пароль и код подтверждения не загружаются, а сохранять такой
+    экземпляр нельзя - записи в кэше могут отставать от базы.
+    """
+    key = USER_KEY.format(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = get_user_from_db(user_id, SECRET_FIELDS)
+        cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+    return check_active(user)
+
+
+def get_user_from_db(user_id, deferred=()):
+    try:
+        return CustomUser.objects.defer(*deferred).get(pk=user_id)
+    except CustomUser.DoesNotExist:
+        raise AuthenticationFailed(
+            _('User not found'), code='user_not_found'
+        )
+
+
+def check_active(user):
+    if not user.is_active:
+        raise AuthenticationFailed(
+            _('User is inactive'), code='user_inactive'
+        )
+    return user
+
+
+def get_token_generation(user_id):
+    """
+    Текущее поколение токенов пользователя. Хранится в кэше не дольше
+    USER_CACHE_TIMEOUT секунд: кэш может быть своим у каждого процесса,
+    а сигнал сбрасывает его только в том, где пользователь сохранен.
+    """
+    key = GENERATION_KEY.format(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        generation = CustomUser.objects.filter(pk=user_id).values_list(
+            'token_generation', flat=True
+        ).first()
+        if generation is None:
+            raise AuthenticationFailed(
+                _('User not found'), code='user_not_found'
+            )
+        cache.set(key, generation, settings.USER_CACHE_TIMEOUT)
+    return generation
+
+
+class TokenCache:
+    """
+    Ограниченный LRU-кэш проверенных токенов в памяти процесса.
+    Ключ - хэш строки токена, запись живет до exp токена: повторный
+    запрос с тем же токеном не проверяет подпись и не разбирает JSON.
+    Размер по умолчанию - JWT_TOKEN_CACHE_SIZE.
+    """
+
+    def __init__(self, size=None):
+        self.size = size
+        self.tokens = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, raw_token):
+        key = sha256(raw_token).digest()
+        with self.lock:
+            entry = self.tokens.get(key)
+            if entry is not None and entry[0] <= time():
+                del self.tokens[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.tokens.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def get_size(self):
+        if self.size is None:
+            return settings.JWT_TOKEN_CACHE_SIZE
+        return self.size
+
+    def set(self, raw_token, token):
+        size = self.get_size()
+        if not size:
+            return
+        key = sha256(raw_token).digest()
+        with self.lock:
+            self.tokens[key] = (token['exp'], token)
+            self.tokens.move_to_end(key)
+            while len(self.tokens) > size:
+                self.tokens.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.tokens.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size': len(self.tokens),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+token_cache = TokenCache()
+
+
+def get_role_claims(user):
+    """Утверждения о роли для токена в режиме JWT_ROLE_CLAIMS."""
+    return {
+        'role': user.role,
+        'is_superuser': user.is_superuser,
+        'username': user.username,
+        GENERATION_CLAIM: user.token_generation,
+    }
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация, которая не читает пользователя из базы
+    на каждый запрос на чтение: найденный пользователь хранится в общем
+    кэше USER_CACHE_TIMEOUT секунд и сбрасывается сигналами при сохранении
+    и удалении, поэтому смена роли действует сразу. Запросы на изменение
+    получают пользователя из базы, чтобы его сохранение не затирало
+    столбцы, измененные в обход сигналов.
+
+    Если токен выдан с утверждениями о роли (JWT_ROLE_CLAIMS), для
+    запросов на чтение пользователь собирается из самого токена.
+    Поколение токенов в утверждении сверяется с текущим: смена роли
+    увеличивает его и отзывает выданные раньше токены.
+
+    Проверенные токены хранятся в token_cache до истечения срока.
+    """
+    read_only = False
+
+    def get_validated_token(self, raw_token):
+        token = token_cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            token_cache.set(raw_token, token)
+        return token
+
+    def authenticate(self, request):
+        self.read_only = request.method in permissions.SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        generation = validated_token.get(GENERATION_CLAIM)
+        if settings.JWT_ROLE_CLAIMS and generation is not None:
+            if generation != get_token_generation(user_id):
+                raise AuthenticationFailed(
+                    'Токен отозван, получите новый', code='token_revoked'
+                )
+            if self.read_only:
+                return RoleTokenUser(validated_token)
+        if self.read_only:
+            return get_cached_user(user_id)
+        return check_active(get_user_from_db(user_id))
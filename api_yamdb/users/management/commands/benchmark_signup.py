@@ -0,0 +1,68 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory
+
+from users.views import signup
+
+NO_THROTTLE = {
+    'auth_ip': {'rate': None},
+    'auth_username': {'rate': None},
+}
+
+
+def run_signups(number, prefix):
+    """Регистрируем number пользователей; возвращаем время и запросы."""
+    factory = APIRequestFactory()
+    requests = [
+        factory.post('/api/v1/auth/signup/', {
+            'email': f'{prefix}{index}@yamdb.fake',
+            'username': f'{prefix}{index}',
+        }, format='json')
+        for index in range(number)
+    ]
+    queries = 0
+
+    def count_query(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_query):
+        start = perf_counter()
+        for request in requests:
+            response = signup(request)
+            if response.status_code != 200:
+                raise CommandError(
+                    f'Регистрация вернула {response.status_code}: '
+                    f'{response.data}'
+                )
+        elapsed = perf_counter() - start
+    return elapsed, queries
+
+
+class Command(BaseCommand):
+    help = "Замеряем скорость регистрации новых и повторных пользователей"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--number', type=int, default=1000,
+            help='Количество регистраций в одном замере'
+        )
+
+    @override_settings(THROTTLE_BUCKETS=NO_THROTTLE)
+    def handle(self, *args, **options):
+        number = options['number']
+        if number < 1:
+            raise CommandError('--number должно быть не меньше 1')
+        with transaction.atomic():
+            for name in ('новые', 'повторные'):
+                elapsed, queries = run_signups(number, 'benchmark_')
+                self.stdout.write(
+                    f'{name}: {number / elapsed:.0f} регистраций/с, '
+                    f'{queries / number:.1f} запросов на регистрацию'
+                )
+            # Созданные при замере пользователи и письма не сохраняем.
+            transaction.set_rollback(True)
@@ -0,0 +1,149 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from time import sleep
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from users.models import OutboxEmail
+
+DEFAULT_BATCH_SIZE = 100
+
+
+def claim_batch(size):
+    """
+    Берем пачку писем, которые пора отправить, и откладываем их
+    на EMAIL_OUTBOX_LEASE секунд, чтобы другой обработчик их не взял.
+    Каждое письмо забираем условным UPDATE по прежнему next_attempt:
+    если его уже забрал другой обработчик, строка не обновится.
+    Работает на любой базе, в том числе на SQLite без SELECT FOR UPDATE.
+    Если обработчик упадет, письма вернутся в очередь по истечении срока.
+    """
+    now = timezone.now()
+    lease = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+    while True:
+        candidates = list(OutboxEmail.objects.filter(
+            next_attempt__lte=now,
+            attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+        ).order_by('next_attempt', 'id')[:size])
+        emails = []
+        for email in candidates:
+            claimed = OutboxEmail.objects.filter(
+                pk=email.pk, next_attempt=email.next_attempt
+            ).update(next_attempt=lease)
+            if claimed:
+                email.next_attempt = lease
+                emails.append(email)
+        # Если все письма пачки забрали другие, берем следующие.
+        if emails or not candidates:
+            return emails
+
+
+def send_emails(emails):
+    """
+    Отправляем письма через одно соединение с почтовым сервером.
+    Выполняется в потоке пула и не обращается к базе.
+    Возвращаем пары (письмо, ошибка или None).
+    """
+    try:
+        with get_connection() as connection:
+            return [
+                (email, send_email(email, connection)) for email in emails
+            ]
+    except Exception as error:
+        return [(email, error) for email in emails]
+
+
+def send_email(email, connection):
+    try:
+        EmailMessage(
+            email.subject, email.body, email.from_email, [email.to],
+            connection=connection
+        ).send()
+    except Exception as error:
+        return error
+    return None
+
+
+def retry_delay(attempts):
+    """Пауза перед повтором растет вдвое с каждой неудачной попыткой."""
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def save_results(results):
+    """Отправленные письма удаляем, неудачным назначаем новую попытку."""
+    now = timezone.now()
+    sent, failed = [], []
+    for email, error in results:
+        if error is None:
+            sent.append(email.pk)
+            continue
+        email.attempts += 1
+        email.next_attempt = now + retry_delay(email.attempts)
+        email.last_error = f'{type(error).__name__}: {error}'
+        failed.append(email)
+    OutboxEmail.objects.filter(pk__in=sent).delete()
+    OutboxEmail.objects.bulk_update(
+        failed, ('attempts', 'next_attempt', 'last_error')
+    )
+    return len(sent), len(failed)
+
+
+def drain(executor, workers, batch_size):
+    """Отправляем все письма, которые пора отправить; возвращаем счетчики."""
+    sent = failed = 0
+    emails = claim_batch(batch_size)
+    while emails:
+        chunks = [emails[start::workers] for start in range(workers)]
+        results = []
+        for chunk_results in executor.map(send_emails, filter(None, chunks)):
+            results.extend(chunk_results)
+        batch_sent, batch_failed = save_results(results)
+        sent += batch_sent
+        failed += batch_failed
+        emails = claim_batch(batch_size)
+    return sent, failed
+
+
+class Command(BaseCommand):
+    help = "Отправляем письма из очереди"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Сколько писем брать из очереди за раз'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Количество потоков отправки'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval с'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза между проверками очереди в режиме --loop, секунд'
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        if workers < 1:
+            raise CommandError('--workers должно быть не меньше 1')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должно быть не меньше 1')
+        with ThreadPoolExecutor(workers) as executor:
+            while True:
+                sent, failed = drain(
+                    executor, workers, options['batch_size']
+                )
+                if sent or failed or not options['loop']:
+                    self.stdout.write(
+                        f'Отправлено писем: {sent}, с ошибкой: {failed}'
+                    )
+                if not options['loop']:
+                    break
+                sleep(options['interval'])
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:12
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_customuser_token_generation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='тема')),
+                ('body', models.TextField(verbose_name='текст')),
+                ('from_email', models.EmailField(max_length=254, verbose_name='отправитель')),
+                ('to', models.EmailField(max_length=254, verbose_name='получатель')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='дата создания')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='неудачных попыток')),
+                ('next_attempt', models.DateTimeField(default=django.utils.timezone.now, verbose_name='следующая попытка')),
+                ('last_error', models.TextField(blank=True, verbose_name='последняя ошибка')),
+            ],
+            options={
+                'verbose_name': 'Письмо в очереди',
+                'verbose_name_plural': 'Письма в очереди',
+                'ordering': ('next_attempt', 'id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outboxemail',
+            index=models.Index(fields=['next_attempt', 'id'], name='outbox_next_attempt_idx'),
+        ),
+    ]
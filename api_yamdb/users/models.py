@@ -1,5 +1,8 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.db import models
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.models import TokenUser
 
 from api_yamdb.settings import CONFIRMATION_CODE_LENGTH
 from .validators import validate_name
@@ -107,6 +110,11 @@ class CustomUser(AbstractBaseUser):
     password = models.CharField(verbose_name='пароль',
                                 max_length=128,
                                 blank=True, null=True)
+    token_generation = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='поколение токенов'
+    )
 
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ['email']
@@ -133,11 +141,105 @@ class CustomUser(AbstractBaseUser):
         return (self.role == UserRole.MODERATOR
                 or self.is_superuser)
 
+    # Поля, которые попадают в токен: при их изменении выданные
+    # токены с утверждениями о роли отзываются.
+    claim_fields = ('role', 'is_superuser', 'is_active')
+
     def __str__(self):
         return f'{self.username}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._loaded_claims = user.get_claims_state()
+        return user
+
+    def get_claims_state(self):
+        return tuple(self.__dict__.get(name) for name in self.claim_fields)
+
+    def save(self, *args, **kwargs):
+        loaded_claims = getattr(self, '_loaded_claims', None)
+        if loaded_claims not in (None, self.get_claims_state()):
+            self.token_generation += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {
+                    *kwargs['update_fields'], 'token_generation'
+                }
+        super().save(*args, **kwargs)
+        self._loaded_claims = self.get_claims_state()
+
     def has_perm(self, perm, obj=None):
         return self.is_admin
 
     def has_module_perms(self, app_label):
         return True
+
+
+class RoleTokenUser(TokenUser):
+    """
+    Пользователь из подписанных утверждений токена. Роли, флага
+    суперпользователя и имени хватает для проверки прав без обращения
+    к базе; остальные атрибуты берутся у полного пользователя, который
+    загружается (через кэш) при первом обращении к ним.
+    """
+
+    @cached_property
+    def role(self):
+        return self.token.get('role', UserRole.USER)
+
+    @property
+    def is_user(self):
+        return self.role == UserRole.USER
+
+    @property
+    def is_admin_or_superuser(self):
+        return self.role == UserRole.ADMIN or self.is_superuser
+
+    @property
+    def is_moderator(self):
+        return self.role == UserRole.MODERATOR or self.is_superuser
+
+    @cached_property
+    def user(self):
+        from .authentication import get_cached_user
+        return get_cached_user(self.id)
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name == 'token':
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+
+class OutboxEmail(models.Model):
+    """
+    Письмо в очереди на отправку. Записывается в той же транзакции,
+    что и данные, о которых оно сообщает; отправляет команда send_outbox.
+    """
+    subject = models.CharField(max_length=255, verbose_name='тема')
+    body = models.TextField(verbose_name='текст')
+    from_email = models.EmailField(verbose_name='отправитель')
+    to = models.EmailField(verbose_name='получатель')
+    created = models.DateTimeField(
+        auto_now_add=True, verbose_name='дата создания'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='неудачных попыток'
+    )
+    next_attempt = models.DateTimeField(
+        default=timezone.now, verbose_name='следующая попытка'
+    )
+    last_error = models.TextField(blank=True, verbose_name='последняя ошибка')
+
+    class Meta:
+        ordering = ('next_attempt', 'id')
+        indexes = [
+            models.Index(
+                fields=('next_attempt', 'id'),
+                name='outbox_next_attempt_idx'
+            ),
+        ]
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Письма в очереди'
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
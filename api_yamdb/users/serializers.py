@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from users.models import CustomUser
+from users.validators import validate_name
 
 
 class CustomUserSerializer(serializers.ModelSerializer):
@@ -27,11 +28,19 @@ class CustomUserSerializer(serializers.ModelSerializer):
 
 
 class SignUpSerializer(serializers.ModelSerializer):
-    """Сериализатор для эндпоинта регистрации пользователей."""
+    """
+    Сериализатор для эндпоинта регистрации пользователей.
+    Проверяет только формат полей: уникальность username и email
+    проверяют ограничения базы при сохранении.
+    """
 
     class Meta:
         model = CustomUser
         fields = ('email', 'username')
+        extra_kwargs = {
+            'email': {'validators': []},
+            'username': {'validators': [validate_name]},
+        }
 
 
 class GetTokenSerializer(serializers.Serializer):
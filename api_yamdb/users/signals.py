@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_user
+from .models import CustomUser
+
+
+@receiver((post_save, post_delete), sender=CustomUser)
+def user_changed(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
@@ -0,0 +1,104 @@
+from hashlib import sha256
+from math import ceil
+from time import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+def parse_rate(rate):
+    """Скорость в формате DRF ('5/m', '100/h') в токенах за секунду."""
+    try:
+        number, period = rate.split('/')
+        return int(number) / DURATIONS[period[0]]
+    except (KeyError, IndexError, ValueError):
+        raise ImproperlyConfigured(
+            f'Неверная скорость в THROTTLE_BUCKETS: {rate!r}'
+        )
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Ограничение частоты запросов по алгоритму «ведро токенов».
+    В ведре не больше burst токенов, они пополняются со скоростью rate,
+    каждый запрос забирает один. Настройки берутся из
+    THROTTLE_BUCKETS[scope]; rate = None отключает ограничение.
+
+    Ведра хранятся в кэше cache_alias, общем для всех процессов,
+    поэтому лимит действует на все процессы сразу.
+    Чтение и запись ведра не атомарны: одновременные запросы могут
+    изредка пропустить пару лишних запросов сверх burst.
+    Проверка выполняется до обработчика и не обращается к базе.
+    """
+    scope = None
+    cache_alias = 'shared'
+    timer = time
+
+    def __init__(self):
+        bucket = settings.THROTTLE_BUCKETS[self.scope]
+        self.rate = (
+            None if bucket['rate'] is None else parse_rate(bucket['rate'])
+        )
+        self.burst = bucket.get('burst', 1)
+        self.wait_time = None
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def get_ident_key(self, request):
+        """Чье ведро: строка или None, если запрос не ограничивается."""
+        raise NotImplementedError('.get_ident_key() must be overridden')
+
+    def get_cache_key(self, ident):
+        digest = sha256(ident.encode()).hexdigest()
+        return f'throttle:{self.scope}:{digest}'
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        ident = self.get_ident_key(request)
+        if ident is None:
+            return True
+        key = self.get_cache_key(ident)
+        now = self.timer()
+        tokens, updated = self.cache.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self.wait_time = (1 - tokens) / self.rate
+            return False
+        self.cache.set(
+            key, (tokens - 1, now), ceil(self.burst / self.rate)
+        )
+        return True
+
+    def wait(self):
+        return self.wait_time
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Ведро на IP-адрес клиента (с учетом NUM_PROXIES из DRF)."""
+    scope = 'auth_ip'
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+
+class UsernameTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Ведро на username из тела запроса: перебор кодов подтверждения
+    и повторные письма одному пользователю ограничены, даже если
+    запросы идут с разных адресов.
+    """
+    scope = 'auth_username'
+
+    def get_ident_key(self, request):
+        data = request.data
+        username = data.get('username') if hasattr(data, 'get') else None
+        if not isinstance(username, str) or not username:
+            return None
+        return username.lower()
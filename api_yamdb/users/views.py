@@ -1,15 +1,37 @@
 from api.permissions import OnlyAdminPermission
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import (filters, pagination, permissions, response, status,
-                            views, viewsets)
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework import (filters, pagination, permissions, response,
+                            serializers, status, views, viewsets)
+from rest_framework.decorators import (api_view, permission_classes,
+                                       throttle_classes)
+from rest_framework.settings import api_settings
+from users.authentication import invalidate_user
 from users.models import CustomUser
 from users.utils import get_tokens_for_user
 
 from .serializers import (CustomUserSerializer, GetTokenSerializer,
                           SignUpSerializer)
-from .utils import send_confirmation_code_to_email
+from .throttling import IPTokenBucketThrottle, UsernameTokenBucketThrottle
+from .utils import make_confirmation_code, queue_confirmation_email
+
+AUTH_THROTTLES = (IPTokenBucketThrottle, UsernameTokenBucketThrottle)
+
+SIGNUP_CONFLICTS = (
+    ('username', 'Это имя пользователя уже занято.'),
+    ('email', 'Этот email уже зарегистрирован с другим именем пользователя.'),
+)
+
+
+def get_signup_conflict(error):
+    """Ошибку уникальности из базы переводим в ошибку поля."""
+    for field, message in SIGNUP_CONFLICTS:
+        if field in str(error):
+            return {field: [message]}
+    return {api_settings.NON_FIELD_ERRORS_KEY: [
+        'Пользователь с такими данными уже существует.'
+    ]}
 
 
 class CustomUserViewSet(viewsets.ModelViewSet):
@@ -26,20 +48,39 @@ class CustomUserViewSet(viewsets.ModelViewSet):
 
 @api_view(('POST',))
 @permission_classes((permissions.AllowAny,))
+@throttle_classes(AUTH_THROTTLES)
 def signup(request):
-    """Функция проверки входа."""
-    username = request.data.get('username')
-    email = request.data.get('email')
-    if CustomUser.objects.filter(username=username, email=email).exists():
-        user = get_object_or_404(CustomUser, username=username)
-        serializer = SignUpSerializer(
-            user, data=request.data, partial=True
-        )
-    else:
-        serializer = SignUpSerializer(data=request.data)
+    """
+    Регистрация или повторный запрос кода: не больше двух запросов
+    в одной транзакции. Id пользователя с теми же username и email
+    выбирается одним SELECT, затем код сохраняется одним UPDATE по id,
+    а если такого пользователя нет - одним INSERT нового. Занятые
+    username или email отклоняют ограничения уникальности базы.
+    """
+    serializer = SignUpSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    serializer.save()
-    send_confirmation_code_to_email(username)
+    username = serializer.validated_data['username']
+    email = serializer.validated_data['email']
+    confirmation_code = make_confirmation_code()
+    try:
+        with transaction.atomic():
+            user_id = CustomUser.objects.filter(
+                username=username, email=email
+            ).values_list('pk', flat=True).first()
+            if user_id is None:
+                CustomUser.objects.create(
+                    username=username, email=email,
+                    confirmation_code=confirmation_code
+                )
+            else:
+                CustomUser.objects.filter(pk=user_id).update(
+                    confirmation_code=confirmation_code
+                )
+                # update() не отправляет сигналы, сбрасываем кэш сами.
+                invalidate_user(user_id)
+            queue_confirmation_email(email, confirmation_code)
+    except IntegrityError as error:
+        raise serializers.ValidationError(get_signup_conflict(error))
     return response.Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -71,6 +112,7 @@ class UsersMeApiView(views.APIView):
 
 @api_view(('POST',))
 @permission_classes((permissions.AllowAny,))
+@throttle_classes(AUTH_THROTTLES)
 def get_token(request):
     """Функция для токена."""
     serializer = GetTokenSerializer(data=request.data)
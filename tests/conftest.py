@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +34,20 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache, caches
+
+    from api.object_cache import category_cache, genre_cache
+    from users.authentication import token_cache
+
+    cache.clear()
+    caches['shared'].clear()
+    token_cache.clear()
+    yield
+    cache.clear()
+    caches['shared'].clear()
+    category_cache.clear_local()
+    genre_cache.clear_local()
@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08RatingAggregates:
+
+    def test_01_rating_follows_review_changes(self, admin_client, user_client,
+                                              moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/'
+
+        create_single_review(user_client, title_id, 'Так себе', 2)
+        response = create_single_review(
+            moderator_client, title_id, 'Отлично', 9
+        )
+        review_id = response.json()['id']
+        assert admin_client.get(url).json().get('rating') == 5, (
+            'Проверьте, что после создания отзывов рейтинг произведения '
+            'равен средней оценке.'
+        )
+
+        response = moderator_client.patch(
+            f'{url}reviews/{review_id}/', data={'score': 10}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert admin_client.get(url).json().get('rating') == 6, (
+            'Проверьте, что после изменения оценки в отзыве рейтинг '
+            'произведения пересчитывается.'
+        )
+
+        response = moderator_client.delete(f'{url}reviews/{review_id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert admin_client.get(url).json().get('rating') == 2, (
+            'Проверьте, что после удаления отзыва рейтинг произведения '
+            'пересчитывается.'
+        )
+
+    def test_02_recalculate_ratings_command(self, admin_client, user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Хорошо', 8)
+        Title.objects.update(score_sum=0, score_count=0)
+
+        call_command('recalculate_ratings')
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.score_count) == (8, 1), (
+            'Проверьте, что команда `recalculate_ratings` восстанавливает '
+            'сумму и количество оценок по отзывам.'
+        )
+        title = Title.objects.get(pk=titles[1]['id'])
+        assert (title.score_sum, title.score_count) == (0, 0)
+
+    def test_03_rating_outside_api(self, admin_client, user, user_client,
+                                   moderator_client):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        first, second = (titles[0]['id'], titles[1]['id'])
+        create_single_review(user_client, first, 'Плохо', 2)
+        create_single_review(moderator_client, first, 'Хорошо', 8)
+
+        # Правка в админке: перенос отзыва на другое произведение.
+        review = Review.objects.get(author=user)
+        review.title_id = second
+        review.score = 4
+        review.save()
+        assert Title.objects.get(pk=first).rating == 8
+        assert Title.objects.get(pk=second).rating == 4
+
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        title = Title.objects.get(pk=second)
+        assert (title.score_sum, title.score_count) == (0, 0), (
+            'Проверьте, что каскадное удаление отзывов вместе с автором '
+            'пересчитывает рейтинг.'
+        )
@@ -0,0 +1,175 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryBudget:
+
+    def test_01_title_list_queries(self, client, admin_client,
+                                   django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        for idx in range(8):
+            admin_client.post('/api/v1/titles/', data={
+                'name': f'Произведение {idx}',
+                'year': 2000,
+                'genre': titles[0]['genre'],
+                'category': titles[0]['category'],
+            })
+
+        # COUNT для пагинации, сами произведения, жанры одним запросом.
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/')
+        assert len(response.json()['results']) == 10
+
+    def test_02_title_detail_queries(self, client, admin_client,
+                                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert len(response.json()['genre']) == 2
+
+    def test_03_category_and_genre_lookups_are_cached(self, client,
+                                                      admin_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        titles, _, _ = create_titles(admin_client)
+        data = {
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': titles[0]['genre'],
+            'category': titles[0]['category'],
+        }
+        with CaptureQueriesContext(connection) as context:
+            admin_client.post('/api/v1/titles/', data=data)
+            client.get(
+                f'/api/v1/titles/?genre={data["genre"][0]}'
+                f'&category={data["category"]}'
+            )
+        lookups = [
+            query['sql'] for query in context.captured_queries
+            if '"reviews_category"."slug" =' in query['sql']
+            or '"reviews_genre"."slug" =' in query['sql']
+        ]
+        assert not lookups, (
+            'Проверьте, что категории и жанры по слагу при создании '
+            'произведения и в фильтрах берутся из кэша.'
+        )
+
+    def test_04_explain_queries_report(self, admin_client, user_client):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        titles, _, _ = create_titles(admin_client)
+        response = user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Отзыв', 'score': 5}
+        )
+        user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{response.json()["id"]}/comments/',
+            data={'text': 'Комментарий'}
+        )
+        out = StringIO()
+        call_command('explain_queries', stdout=out)
+        report = out.getvalue()
+        for index in ('review_title_pub_date_idx',
+                      'comment_review_pub_date_idx',
+                      'title_category_year_idx'):
+            assert index in report, (
+                f'Проверьте, что списки API используют индекс `{index}`.'
+            )
+        titles_year = report.split('titles?year')[1].split('titles?name')[0]
+        assert '! SCAN reviews_title' in titles_year, (
+            'Проверьте, что просмотр всей таблицы по индексу сортировки '
+            'с фильтром считается проблемой.'
+        )
+        titles_list = report.split('\ntitles\n')[1].split('titles?')[0]
+        assert '!' not in titles_list, (
+            'Проверьте, что просмотр по индексу сортировки без фильтров '
+            'с LIMIT не считается проблемой.'
+        )
+
+    def test_05_review_write_queries(self, admin_client, user, user_client,
+                                     django_assert_max_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        # Пользователь, произведение, BEGIN, вставка отзыва, оценки.
+        with django_assert_max_num_queries(5):
+            response = user_client.post(url, data={'text': 'Да', 'score': 5})
+        assert response.status_code == 201
+
+        # Пользователь, отзыв по id и произведению, BEGIN, прежняя оценка
+        # с блокировкой, обновление, оценки.
+        with django_assert_max_num_queries(6):
+            response = user_client.patch(
+                f'{url}{response.json()["id"]}/', data={'score': 7}
+            )
+        assert response.status_code == 200
+
+        with django_assert_max_num_queries(5):
+            response = user_client.post(url, data={'text': 'Еще', 'score': 1})
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв отклоняется с кодом 400 '
+            'по ограничению уникальности в базе.'
+        )
+        assert 'non_field_errors' in response.json()
+
+    def test_06_nested_list_queries(self, client, admin_client, admin, user,
+                                    user_client, moderator, moderator_client,
+                                    django_assert_num_queries):
+        from tests.utils import create_comments
+
+        comments, reviews, titles = create_comments(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+
+        # COUNT и страница вместе с авторами, без запроса родителя.
+        for url, count in ((reviews_url, 2), (comments_url, 2)):
+            with django_assert_num_queries(2):
+                response = client.get(url)
+            assert response.json()['count'] == count, (
+                'Проверьте, что список отзывов и комментариев читается '
+                'постоянным числом запросов.'
+            )
+
+        # Пустой список: страницу не читаем, вместо нее проверяем родителя.
+        with django_assert_num_queries(2):
+            response = client.get(
+                f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+            )
+        assert response.json()['count'] == 0
+        for url in ('/api/v1/titles/0/reviews/',
+                    f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+                    f'{reviews[0]["id"]}/comments/'):
+            assert client.get(url).status_code == 404
+
+    def test_07_object_cache_is_shared(self, admin_client,
+                                       django_assert_num_queries):
+        from django.core.cache import cache, caches
+
+        from api.object_cache import VERSION_KEY, category_cache
+
+        _, categories, _ = create_titles(admin_client)
+        slug = categories[0]['slug']
+        category_cache.get('slug', slug)
+
+        # Другой процесс: свой первый уровень, тот же общий кэш.
+        cache.clear()
+        category_cache.clear_local()
+        with django_assert_num_queries(0):
+            assert category_cache.get('slug', slug).slug == slug
+
+        # Другой процесс сбросил кэш, первый уровень истек.
+        caches['shared'].set(
+            VERSION_KEY.format('reviews.category'), 'other', None
+        )
+        category_cache.clear_local()
+        with django_assert_num_queries(1):
+            category_cache.get('slug', slug)
@@ -0,0 +1,46 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    def test_01_titles_cursor_walk(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        for _ in range(12):
+            admin_client.post('/api/v1/titles/', data={
+                'name': 'Дубль',
+                'year': 2000,
+                'genre': titles[0]['genre'],
+                'category': titles[0]['category'],
+            })
+
+        response = client.get('/api/v1/titles/?cursor=')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в курсорном режиме не выполняется подсчет '
+            'всех записей.'
+        )
+        seen = [title['id'] for title in data['results']]
+        assert len(seen) == 10
+        response = client.get(data['next'])
+        next_page = response.json()
+        seen += [title['id'] for title in next_page['results']]
+        assert next_page['next'] is None
+        assert len(seen) == len(set(seen)) == 14, (
+            'Проверьте, что курсорная пагинация не теряет и не повторяет '
+            'произведения с одинаковыми названиями.'
+        )
+
+        response = client.get(next_page['previous'])
+        assert [
+            title['id'] for title in response.json()['results']
+        ] == seen[:10]
+
+    def test_02_invalid_cursor(self, client):
+        response = client.get('/api/v1/titles/?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
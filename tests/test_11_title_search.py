@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+
+    def test_01_search_titles(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+
+        response = client.get('/api/v1/titles/?search=орешек')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [
+            titles[1]['id']
+        ], (
+            'Проверьте, что параметр `search` ищет произведения по названию.'
+        )
+
+        response = client.get('/api/v1/titles/?search=back')
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[0]['id']
+        ], (
+            'Проверьте, что параметр `search` ищет произведения по описанию.'
+        )
+
+    def test_02_search_index_follows_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Чужой'}
+        )
+
+        response = client.get('/api/v1/titles/?search=терминатор')
+        assert response.json()['results'] == []
+        response = client.get('/api/v1/titles/?search=чуж')
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[0]['id']
+        ]
+
+    def test_03_autocomplete(self, client, admin_client,
+                             django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+
+        with django_assert_num_queries(1):
+            response = client.get('/api/v1/titles/autocomplete/?q=КРЕП')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == [
+            {'id': titles[1]['id'], 'name': titles[1]['name']}
+        ], (
+            'Проверьте, что `/api/v1/titles/autocomplete/` возвращает id и '
+            'название произведений, начинающихся с переданной строки.'
+        )
+
+        response = client.get('/api/v1/titles/autocomplete/?q=орешек')
+        assert response.json() == []
+        response = client.get('/api/v1/titles/autocomplete/?q=')
+        assert response.json() == []
@@ -0,0 +1,148 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ResponseCache:
+
+    def test_01_anonymous_list_is_cached(self, client, admin_client,
+                                         django_assert_num_queries):
+        create_titles(admin_client)
+        first = client.get('/api/v1/titles/?year=1984&name=Терм')
+
+        with django_assert_num_queries(0):
+            second = client.get('/api/v1/titles/?name=Терм&year=1984')
+        assert second.content == first.content, (
+            'Проверьте, что повторный анонимный GET-запрос с теми же '
+            'параметрами в другом порядке отдается из кэша.'
+        )
+
+    def test_02_review_invalidates_only_its_title(self, client, admin_client,
+                                                  user_client,
+                                                  django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        first_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        second_url = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        client.get(first_url)
+        client.get(second_url)
+
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 10)
+
+        response = client.get(first_url)
+        assert response.json()['count'] == 1, (
+            'Проверьте, что новый отзыв сбрасывает кэш списка отзывов '
+            'своего произведения.'
+        )
+        with django_assert_num_queries(0):
+            client.get(second_url)
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['rating'] == 10
+
+    def test_03_authenticated_requests_bypass_cache(self, client,
+                                                    admin_client):
+        client.get('/api/v1/categories/')
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'}
+        )
+        response = client.get('/api/v1/categories/')
+        assert response.json()['count'] == 1
+
+    def test_04_file_based_backend(self, client, admin_client, settings,
+                                   tmp_path, django_assert_num_queries):
+        settings.CACHES = {
+            **settings.CACHES,
+            'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.'
+                           'FileBasedCache',
+                'LOCATION': str(tmp_path),
+            }
+        }
+        create_titles(admin_client)
+        client.get('/api/v1/genres/')
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/genres/')
+        assert response.json()['count'] == 3
+        assert list(tmp_path.iterdir()), (
+            'Проверьте, что кэш ответов работает с файловым бэкендом.'
+        )
+
+    def test_05_conditional_get(self, client, admin_client, user_client,
+                                django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        etags = {}
+        for url in (title_url, reviews_url):
+            response = client.get(url)
+            etags[url] = response['ETag']
+            assert etags[url], (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовок ETag.'
+            )
+            with django_assert_num_queries(0):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                'If-None-Match возвращает ответ со статусом 304.'
+            )
+
+        other_url = f'/api/v1/titles/{titles[1]["id"]}/'
+        other_etag = client.get(other_url)['ETag']
+        create_single_review(user_client, titles[0]['id'], 'Хорошо', 7)
+
+        for url in (title_url, reviews_url):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после нового отзыва ETag `{url}` меняется.'
+            )
+        response = client.get(other_url, HTTP_IF_NONE_MATCH=other_etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_06_cache_key_includes_host(self, client, admin_client):
+        create_titles(admin_client)
+        for number in range(10):
+            admin_client.post('/api/v1/categories/', data={
+                'name': f'Категория {number}', 'slug': f'category{number}'
+            })
+        url = '/api/v1/categories/'
+        first = client.get(url, HTTP_HOST='one.example')
+        assert first.json()['next'].startswith('http://one.example/')
+
+        second = client.get(url, HTTP_HOST='two.example')
+        assert second.json()['next'].startswith('http://two.example/'), (
+            'Проверьте, что кэш ответов различает хосты: ссылки next и '
+            'previous в ответе абсолютные.'
+        )
+        secure = client.get(url, HTTP_HOST='one.example', secure=True)
+        assert secure.json()['next'].startswith('https://one.example/')
+
+    def test_07_author_rename_invalidates_lists(self, client, admin_client,
+                                                user, user_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Отлично', 10
+        ).json()
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{review["id"]}/comments/'
+        user_client.post(comments_url, data={'text': 'Согласен'})
+        first = client.get(reviews_url)
+        client.get(comments_url)
+
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'username': 'renamed'}
+        )
+
+        response = client.get(
+            reviews_url, HTTP_IF_NONE_MATCH=first['ETag']
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'][0]['author'] == 'renamed', (
+            'Проверьте, что смена имени автора сбрасывает кэш списков '
+            'отзывов.'
+        )
+        assert client.get(comments_url).json()['results'][0]['author'] == (
+            'renamed'
+        )
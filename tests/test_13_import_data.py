@@ -0,0 +1,294 @@
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ImportData:
+
+    def test_01_import_data(self):
+        from reviews.models import Comment, GenreTitle, Review, Title
+        from users.models import CustomUser
+
+        out = StringIO()
+        call_command('import_data', batch_size=10, stdout=out)
+
+        expected = (
+            (CustomUser, 5), (Title, 32), (GenreTitle, 42),
+            (Review, 72), (Comment, 3),
+        )
+        for model, count in expected:
+            assert model.objects.count() == count, (
+                f'Проверьте, что `import_data` загружает все строки '
+                f'для {model.__name__}.'
+            )
+        title = Title.objects.get(pk=1)
+        assert title.name_normalized == 'побег из шоушенка'
+        assert title.score_count == Review.objects.filter(title=1).count()
+        assert 'строк/с' in out.getvalue()
+
+        call_command('import_data', stdout=out)
+        assert Review.objects.count() == 72
+
+    def test_02_import_data_with_workers(self):
+        from reviews.models import Comment, Review, Title
+
+        call_command(
+            'import_data', batch_size=20, workers=2, stdout=StringIO()
+        )
+
+        assert Title.objects.count() == 32
+        assert Review.objects.count() == 72, (
+            'Проверьте, что `import_data --workers` загружает те же данные, '
+            'что и однопроцессный режим.'
+        )
+        assert Comment.objects.count() == 3
+
+    def test_03_upsert(self, settings, tmp_path):
+        import shutil
+
+        from reviews.models import GenreTitle, Review, Title
+
+        call_command('import_data', stdout=StringIO())
+        data_dir = tmp_path / 'static' / 'data'
+        shutil.copytree(
+            os.path.join(settings.BASE_DIR, 'static', 'data'), data_dir
+        )
+        titles_csv = data_dir / 'titles.csv'
+        lines = titles_csv.read_text(encoding='utf-8').splitlines()
+        lines[1] = lines[1].replace('Побег из Шоушенка', 'Побег')
+        del lines[2]
+        lines.append('1000,Новое произведение,2020,1')
+        titles_csv.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        settings.BASE_DIR = str(tmp_path)
+
+        out = StringIO()
+        call_command('import_data', upsert=True, delete_missing=True,
+                     stdout=out)
+
+        assert Title.objects.get(pk=1).name == 'Побег'
+        assert Title.objects.get(pk=1000).name_normalized == (
+            'новое произведение'
+        )
+        assert not Title.objects.filter(pk=2).exists(), (
+            'Проверьте, что `import_data --upsert --delete-missing` удаляет '
+            'объекты, которых нет в CSV.'
+        )
+        assert Title.objects.count() == 32
+        assert not GenreTitle.objects.filter(title=2).exists()
+        assert not Review.objects.filter(title=2).exists()
+        report = out.getvalue()
+        assert 'Title: вставлено 1' in report
+        assert 'обновлено 1,' in report, (
+            'Проверьте, что `import_data --upsert` обновляет только '
+            'изменившиеся строки.'
+        )
+        assert 'Review: вставлено 0' in report
+
+    def test_04_resume_compressed_source(self, settings, tmp_path,
+                                         monkeypatch):
+        import gzip
+        import lzma
+
+        from reviews.management.commands import import_data
+        from reviews.models import Comment, Review, Title
+
+        data_dir = os.path.join(settings.BASE_DIR, 'static', 'data')
+        for name in os.listdir(data_dir):
+            with open(os.path.join(data_dir, name), 'rb') as csv_file:
+                content = csv_file.read()
+            opener = lzma.open if name == 'comments.csv' else gzip.open
+            suffix = '.xz' if name == 'comments.csv' else '.gz'
+            with opener(tmp_path / (name + suffix), 'wb') as packed:
+                packed.write(content)
+        checkpoint = tmp_path / 'import.json'
+
+        import_batch = import_data.import_batch
+        calls = []
+
+        def failing_import_batch(model, *args):
+            if model is Review:
+                calls.append(model)
+                if len(calls) == 3:
+                    raise RuntimeError('Импорт прерван')
+            return import_batch(model, *args)
+
+        monkeypatch.setattr(import_data, 'import_batch', failing_import_batch)
+        with pytest.raises(RuntimeError):
+            call_command('import_data', source=str(tmp_path), batch_size=10,
+                         checkpoint=str(checkpoint), stdout=StringIO())
+        assert Review.objects.count() == 20, (
+            'Проверьте, что с `--checkpoint` каждая пачка фиксируется '
+            'в своей транзакции.'
+        )
+        assert checkpoint.exists()
+
+        monkeypatch.setattr(import_data, 'import_batch', import_batch)
+        out = StringIO()
+        call_command('import_data', source=str(tmp_path), batch_size=10,
+                     checkpoint=str(checkpoint), stdout=out)
+
+        assert Title.objects.count() == 32
+        assert Review.objects.count() == 72, (
+            'Проверьте, что `import_data --checkpoint` продолжает '
+            'прерванный импорт с последней записанной пачки.'
+        )
+        assert Comment.objects.count() == 3
+        assert 'Title уже загружены (контрольная точка)' in out.getvalue()
+        assert 'Review: вставлено 52' in out.getvalue()
+        assert not checkpoint.exists()
+
+    def test_05_export_round_trip(self, tmp_path):
+        from reviews.models import Comment, GenreTitle, Review, Title
+        from users.models import CustomUser
+
+        call_command('import_data', stdout=StringIO())
+        Title.objects.filter(pk=1).update(description='Описание, "в кавычках"')
+        titles = list(Title.objects.values())
+        reviews = list(Review.objects.values())
+        comments = list(Comment.objects.values())
+
+        call_command('export_data', str(tmp_path), shard_size=20,
+                     chunk_size=7, gzip=True, stdout=StringIO())
+
+        assert (tmp_path / 'users.csv.gz').exists()
+        assert sorted(
+            path.name for path in tmp_path.glob('review*')
+        ) == [f'review-000{number}.csv.gz' for number in range(1, 5)], (
+            'Проверьте, что `export_data --shard-size` разбивает большие '
+            'таблицы на части.'
+        )
+
+        for model in (Comment, Review, GenreTitle, Title, CustomUser):
+            model.objects.all().delete()
+        call_command('import_data', source=str(tmp_path), stdout=StringIO())
+
+        assert Title.objects.count() == 32
+        assert GenreTitle.objects.count() == 42
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        assert list(Review.objects.values()) == reviews, (
+            'Проверьте, что `import_data` загружает выгрузку `export_data` '
+            'без потерь, включая даты публикации.'
+        )
+        assert list(Comment.objects.values()) == comments
+        assert list(Title.objects.values()) == titles
+
+    def test_06_resume_after_committed_batch(self, tmp_path, monkeypatch):
+        from reviews.management.commands.import_data import Checkpoint
+        from reviews.models import Review
+
+        checkpoint = tmp_path / 'import.json'
+        save = Checkpoint.save
+        calls = []
+
+        def failing_save(self, table, rows, done=False):
+            if table == 'Review' and rows:
+                calls.append(rows)
+                if len(calls) == 3:
+                    raise RuntimeError('Импорт прерван')
+            return save(self, table, rows, done)
+
+        monkeypatch.setattr(Checkpoint, 'save', failing_save)
+        with pytest.raises(RuntimeError):
+            call_command('import_data', batch_size=10,
+                         checkpoint=str(checkpoint), stdout=StringIO())
+        assert Review.objects.count() == 30
+
+        monkeypatch.setattr(Checkpoint, 'save', save)
+        call_command('import_data', batch_size=10,
+                     checkpoint=str(checkpoint), stdout=StringIO())
+        assert Review.objects.count() == 72, (
+            'Проверьте, что пачка, зафиксированная до записи контрольной '
+            'точки, не ломает возобновление импорта.'
+        )
+
+    def test_07_import_keeps_unrelated_cache(self, client):
+        from django.core.cache import cache
+
+        assert client.get('/api/v1/categories/').json()['count'] == 0
+        cache.set('throttle:auth_ip:test', (1, 0), None)
+
+        call_command('import_data', stdout=StringIO())
+
+        assert client.get('/api/v1/categories/').json()['count'] > 0, (
+            'Проверьте, что после импорта кэш ответов API сбрасывается.'
+        )
+        assert cache.get('throttle:auth_ip:test') == (1, 0), (
+            'Проверьте, что импорт не очищает весь общий кэш.'
+        )
+
+    def test_08_upsert_role_revokes_tokens(self, settings, tmp_path):
+        import shutil
+
+        from rest_framework.test import APIClient
+
+        from users.models import CustomUser
+        from users.utils import get_tokens_for_user
+
+        settings.JWT_ROLE_CLAIMS = True
+        call_command('import_data', stdout=StringIO())
+        user = CustomUser.objects.get(pk=101)
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {get_tokens_for_user(user)["token"]}'
+        )
+        assert client.get('/api/v1/users/').status_code == 200
+
+        data_dir = tmp_path / 'static' / 'data'
+        shutil.copytree(
+            os.path.join(settings.BASE_DIR, 'static', 'data'), data_dir
+        )
+        users_csv = data_dir / 'users.csv'
+        content = users_csv.read_text(encoding='utf-8').replace(
+            'capt_obvious@yamdb.fake,admin', 'capt_obvious@yamdb.fake,user'
+        ).replace(
+            'bingobongo@yamdb.fake,user,,', 'bingobongo@yamdb.fake,user,Био,'
+        )
+        users_csv.write_text(content, encoding='utf-8')
+        settings.BASE_DIR = str(tmp_path)
+        call_command('import_data', upsert=True, stdout=StringIO())
+
+        generations = dict(
+            CustomUser.objects.values_list('pk', 'token_generation')
+        )
+        assert (generations[101], generations[100]) == (
+            user.token_generation + 1, 0
+        ), (
+            'Проверьте, что `import_data --upsert` увеличивает поколение '
+            'токенов только при смене роли.'
+        )
+        assert client.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что смена роли при импорте отзывает выданные токены.'
+        )
+
+    def test_09_resume_after_first_committed_batch(self, tmp_path,
+                                                   monkeypatch):
+        from reviews.management.commands.import_data import Checkpoint
+        from reviews.models import Review
+
+        checkpoint = tmp_path / 'import.json'
+        save = Checkpoint.save
+
+        def failing_save(self, table, rows, done=False):
+            if table == 'Review' and rows:
+                raise RuntimeError('Импорт прерван')
+            return save(self, table, rows, done)
+
+        monkeypatch.setattr(Checkpoint, 'save', failing_save)
+        with pytest.raises(RuntimeError):
+            call_command('import_data', batch_size=10,
+                         checkpoint=str(checkpoint), stdout=StringIO())
+        assert Review.objects.count() == 10
+
+        monkeypatch.setattr(Checkpoint, 'save', save)
+        out = StringIO()
+        call_command('import_data', batch_size=10,
+                     checkpoint=str(checkpoint), stdout=out)
+        assert 'Review уже загружены' not in out.getvalue()
+        assert Review.objects.count() == 72, (
+            'Проверьте, что таблица, первая пачка которой зафиксирована '
+            'до записи контрольной точки, догружается при возобновлении.'
+        )
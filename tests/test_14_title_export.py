@@ -0,0 +1,86 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleExport:
+    url = '/api/v1/export/titles.jsonl'
+
+    def test_01_only_admin(self, client, user_client, moderator_client):
+        assert client.get(self.url).status_code == HTTPStatus.UNAUTHORIZED
+        for api_client in (user_client, moderator_client):
+            assert api_client.get(self.url).status_code == (
+                HTTPStatus.FORBIDDEN
+            ), (
+                'Проверьте, что выгрузка произведений доступна только '
+                'администратору.'
+            )
+
+    def test_02_stream_matches_api(self, settings, admin_client, user,
+                                   user_client, moderator, moderator_client):
+        settings.TITLE_EXPORT_CHUNK_SIZE = 1
+        _, titles = create_reviews(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        # Порядок жанров по названию и по слагу различается.
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Абсурд', 'slug': 'zabsurd'}
+        )
+        admin_client.patch(f'/api/v1/titles/{titles[0]["id"]}/', data={
+            'genre': ['horror', 'comedy', 'zabsurd']
+        })
+
+        response = admin_client.get(self.url)
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдается потоковым ответом.'
+        )
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        records = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        titles = admin_client.get('/api/v1/titles/').json()['results']
+        assert [record['id'] for record in records] == sorted(
+            title['id'] for title in titles
+        )
+        for record in records:
+            reviews = admin_client.get(
+                f'/api/v1/titles/{record["id"]}/reviews/'
+            ).json()['results']
+            assert record.pop('reviews') == reviews, (
+                'Проверьте, что отзывы в выгрузке совпадают с API.'
+            )
+            title = admin_client.get(
+                f'/api/v1/titles/{record["id"]}/'
+            ).json()
+            assert record == title, (
+                'Проверьте, что произведение в выгрузке совпадает с API.'
+            )
+
+    def test_03_reviews_are_streamed(self, monkeypatch, admin_client, user,
+                                     user_client, moderator,
+                                     moderator_client):
+        from api import export
+
+        monkeypatch.setattr(export, 'EXPORT_BUFFER_SIZE', 1)
+        create_reviews(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+
+        chunks = list(admin_client.get(self.url).streaming_content)
+
+        records = [
+            json.loads(line) for line in b''.join(chunks).splitlines()
+        ]
+        assert len(chunks) == sum(
+            2 + len(record['reviews']) for record in records
+        ), (
+            'Проверьте, что отзывы пишутся в выгрузку по одному, '
+            'не собираясь в память целиком.'
+        )
@@ -0,0 +1,36 @@
+from collections import OrderedDict
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Renderer:
+
+    def test_01_same_bytes_as_json_renderer(self):
+        from api.renderers import FastJSONRenderer
+
+        data = OrderedDict(
+            id=1, text='Строка с \u2028 и \u2029', score=None,
+            genre=[OrderedDict(name='Драма', slug='drama')],
+        )
+        for media_type in (None, 'application/json',
+                           'application/json; indent=4'):
+            assert FastJSONRenderer().render(data, media_type) == (
+                JSONRenderer().render(data, media_type)
+            ), (
+                'Проверьте, что FastJSONRenderer отдает те же байты, '
+                'что и JSONRenderer.'
+            )
+        assert FastJSONRenderer().render(None) == b''
+
+    def test_02_api_uses_fast_renderer(self, admin_client, user, user_client):
+        create_reviews(admin_client, {user: user_client})
+        for url in ('/api/v1/titles/', '/api/v1/categories/'):
+            response = admin_client.get(url)
+            assert type(response.accepted_renderer).__name__ == (
+                'FastJSONRenderer'
+            )
+            assert response.content == JSONRenderer().render(response.data)
@@ -0,0 +1,62 @@
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ValuesSerializers:
+
+    def test_01_same_data_as_model_serializers(self, admin_client, user,
+                                               user_client, moderator,
+                                               moderator_client):
+        from api.serializers import (CommentSerializer,
+                                     CommentValuesSerializer,
+                                     ReviewSerializer, ReviewValuesSerializer,
+                                     TitleSerializer, TitleValuesSerializer)
+        from reviews.models import Comment, Review, Title
+
+        create_comments(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        Title.objects.create(name='Без категории', year=2000)
+
+        cases = (
+            (Title.objects.prefetch_related('genre'), TitleSerializer,
+             TitleValuesSerializer),
+            (Review.objects.all(), ReviewSerializer, ReviewValuesSerializer),
+            (Comment.objects.all(), CommentSerializer,
+             CommentValuesSerializer),
+        )
+        for queryset, serializer_class, values_serializer_class in cases:
+            expected = serializer_class(queryset, many=True).data
+            rows = values_serializer_class.get_values(queryset)
+            assert values_serializer_class(rows, many=True).data == (
+                expected
+            ), (
+                f'Проверьте, что {values_serializer_class.__name__} '
+                f'отдает те же данные, что и {serializer_class.__name__}.'
+            )
+
+    def test_02_keyset_pages(self, client, admin_client, user, user_client,
+                             moderator, moderator_client, monkeypatch):
+        from api.pagination import ReviewPagination
+
+        _, _, titles = create_comments(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        monkeypatch.setattr(ReviewPagination, 'page_size', 1)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        results = []
+        next_url = f'{url}?cursor='
+        while next_url:
+            data = client.get(next_url).json()
+            results.extend(data['results'])
+            next_url = data['next']
+        assert len(results) == 2
+        assert results == client.get(url).json()['results'] + client.get(
+            url, {'page': 2}
+        ).json()['results'], (
+            'Проверьте, что курсорная пагинация работает со списками, '
+            'собранными из values().'
+        )
@@ -0,0 +1,162 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Authentication:
+
+    def test_01_user_is_cached(self, user_client, django_assert_num_queries):
+        user_client.get('/api/v1/users/me/')
+
+        with django_assert_num_queries(0):
+            response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что пользователь из JWT берется из кэша.'
+        )
+
+    def test_02_role_change_takes_effect(self, admin_client, user,
+                                         user_client):
+        url = '/api/v1/users/'
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+
+        admin_client.patch(f'{url}{user.username}/', data={'role': 'admin'})
+        assert user_client.get(url).status_code == HTTPStatus.OK, (
+            'Проверьте, что смена роли сбрасывает кэш пользователя.'
+        )
+
+        admin_client.delete(f'{url}{user.username}/')
+        assert user_client.get(url).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+
+    def test_03_role_claims(self, settings, admin_client, user):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from rest_framework.test import APIClient
+
+        from users.utils import get_tokens_for_user
+
+        settings.JWT_ROLE_CLAIMS = True
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {get_tokens_for_user(user)["token"]}'
+        )
+        url = '/api/v1/users/'
+        assert client.get(url).status_code == HTTPStatus.FORBIDDEN
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/categories/')
+        assert response.status_code == HTTPStatus.OK
+        assert not [
+            query for query in context.captured_queries
+            if 'users_customuser' in query['sql']
+        ], (
+            'Проверьте, что в режиме JWT_ROLE_CLAIMS права на чтение '
+            'проверяются по утверждениям токена, без загрузки пользователя.'
+        )
+        assert client.get('/api/v1/users/me/').json()['email'] == user.email
+
+        admin_client.patch(f'{url}{user.username}/', data={'role': 'admin'})
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что смена роли отзывает токены со старой ролью.'
+        )
+        user.refresh_from_db()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {get_tokens_for_user(user)["token"]}'
+        )
+        assert client.get(url).status_code == HTTPStatus.OK
+
+    def test_04_validated_tokens_are_cached(self, user, user_client,
+                                            monkeypatch):
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+
+        from users.authentication import TokenCache, token_cache
+
+        user_client.get('/api/v1/users/me/')
+        calls = []
+        validate = JWTAuthentication.get_validated_token
+        monkeypatch.setattr(
+            JWTAuthentication, 'get_validated_token',
+            lambda self, raw_token: calls.append(raw_token) or validate(
+                self, raw_token
+            )
+        )
+        for _ in range(3):
+            assert user_client.get('/api/v1/users/me/').status_code == (
+                HTTPStatus.OK
+            )
+        assert not calls, (
+            'Проверьте, что проверенный токен берется из кэша без повторной '
+            'проверки подписи.'
+        )
+        assert token_cache.stats() == {'size': 1, 'hits': 3, 'misses': 1}
+
+        cache = TokenCache(size=2)
+        for number in range(3):
+            cache.set(f'token{number}'.encode(), {'exp': 2 ** 40})
+        cache.set(b'expired', {'exp': 1})
+        assert cache.get(b'token0') is None
+        assert cache.get(b'expired') is None
+        assert cache.get(b'token2') == {'exp': 2 ** 40}
+        assert cache.stats() == {'size': 1, 'hits': 1, 'misses': 2}
+
+    def test_05_writes_use_fresh_user(self, user, user_client):
+        from django.core.cache import cache
+
+        from users.authentication import USER_KEY
+        from users.models import CustomUser
+
+        user_client.get('/api/v1/users/me/')
+        cached = cache.get(USER_KEY.format(user.id))
+        assert not {'password', 'confirmation_code'} & set(cached.__dict__), (
+            'Проверьте, что пароль и код подтверждения не попадают в кэш.'
+        )
+
+        CustomUser.objects.filter(pk=user.pk).update(
+            confirmation_code='12345', first_name='Имя'
+        )
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'bio': 'О себе'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['first_name'] == 'Имя'
+        user.refresh_from_db()
+        assert (user.confirmation_code, user.first_name, user.bio) == (
+            '12345', 'Имя', 'О себе'
+        ), (
+            'Проверьте, что запросы на изменение не сохраняют устаревшего '
+            'пользователя из кэша.'
+        )
+
+    def test_06_token_generation_expires(self, settings, user, monkeypatch):
+        import time
+
+        from django.db.models import F
+        from rest_framework.test import APIClient
+
+        from users.models import CustomUser
+        from users.utils import get_tokens_for_user
+
+        settings.JWT_ROLE_CLAIMS = True
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {get_tokens_for_user(user)["token"]}'
+        )
+        url = '/api/v1/categories/'
+        assert client.get(url).status_code == HTTPStatus.OK
+
+        # Поколение изменено в другом процессе: сигнал сюда не дошел.
+        CustomUser.objects.filter(pk=user.pk).update(
+            token_generation=F('token_generation') + 1
+        )
+        assert client.get(url).status_code == HTTPStatus.OK
+
+        now = time.time()
+        monkeypatch.setattr(
+            time, 'time', lambda: now + settings.USER_CACHE_TIMEOUT + 1
+        )
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что поколение токенов хранится в кэше ограниченное '
+            'время и отозванный токен перестает приниматься.'
+        )
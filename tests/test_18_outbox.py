@@ -0,0 +1,97 @@
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Outbox:
+
+    def signup(self, client, number):
+        return client.post('/api/v1/auth/signup/', data={
+            'email': f'user{number}@yamdb.fake',
+            'username': f'user{number}',
+        })
+
+    def test_01_signup_queues_email(self, client):
+        from users.models import OutboxEmail
+
+        for number in range(5):
+            assert self.signup(client, number).status_code == 200
+        assert not mail.outbox, (
+            'Проверьте, что регистрация не отправляет письмо в запросе.'
+        )
+        assert OutboxEmail.objects.count() == 5
+
+        out = StringIO()
+        call_command('send_outbox', batch_size=2, workers=3, stdout=out)
+
+        assert sorted(email.to[0] for email in mail.outbox) == [
+            f'user{number}@yamdb.fake' for number in range(5)
+        ]
+        assert not OutboxEmail.objects.exists()
+        assert 'Отправлено писем: 5' in out.getvalue()
+
+    def test_02_failed_email_is_retried_later(self, client, monkeypatch):
+        from django.core.mail import EmailMessage
+        from django.utils import timezone
+
+        from users.models import OutboxEmail
+
+        self.signup(client, 1)
+
+        def fail(self):
+            raise ConnectionError('Сервер недоступен')
+
+        monkeypatch.setattr(EmailMessage, 'send', fail)
+        call_command('send_outbox', stdout=StringIO())
+        email = OutboxEmail.objects.get()
+        assert email.attempts == 1
+        assert 'Сервер недоступен' in email.last_error
+        assert email.next_attempt > timezone.now(), (
+            'Проверьте, что неудачное письмо откладывается на потом.'
+        )
+
+        monkeypatch.undo()
+        call_command('send_outbox', stdout=StringIO())
+        assert not mail.outbox
+
+        OutboxEmail.objects.update(next_attempt=timezone.now())
+        call_command('send_outbox', stdout=StringIO())
+        assert len(mail.outbox) == 1
+        assert not OutboxEmail.objects.exists()
+
+    def test_03_claimed_emails_are_not_shared(self, client):
+        from datetime import timedelta
+
+        from django.db import connection
+        from django.utils import timezone
+
+        from users.management.commands.send_outbox import claim_batch
+        from users.models import OutboxEmail
+
+        for number in range(3):
+            self.signup(client, number)
+        first = OutboxEmail.objects.order_by('next_attempt', 'id').first()
+        competitor = []
+
+        def claim_first_elsewhere(execute, sql, params, many, context):
+            # Другой обработчик забирает первое письмо между чтением
+            # пачки и условным UPDATE.
+            if sql.startswith('UPDATE') and not competitor:
+                competitor.append(first.pk)
+                OutboxEmail.objects.filter(pk=first.pk).update(
+                    next_attempt=timezone.now() + timedelta(hours=1)
+                )
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(claim_first_elsewhere):
+            emails = claim_batch(10)
+        assert competitor == [first.pk]
+        assert first.pk not in [email.pk for email in emails], (
+            'Проверьте, что письмо, забранное другим обработчиком, '
+            'не отправляется повторно.'
+        )
+        assert len(emails) == 2
+        assert claim_batch(10) == []
@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Throttling:
+    url_signup = '/api/v1/auth/signup/'
+    url_token = '/api/v1/auth/token/'
+
+    @pytest.fixture
+    def buckets(self, settings, monkeypatch):
+        from users.throttling import TokenBucketThrottle
+
+        settings.THROTTLE_BUCKETS = {
+            'auth_ip': {'rate': '3/m', 'burst': 3},
+            'auth_username': {'rate': '2/m', 'burst': 2},
+        }
+        now = [1000.0]
+        monkeypatch.setattr(
+            TokenBucketThrottle, 'timer', staticmethod(lambda: now[0])
+        )
+        return now
+
+    def signup(self, client, number, address='127.0.0.1'):
+        return client.post(self.url_signup, data={
+            'email': f'user{number}@yamdb.fake',
+            'username': f'user{number}',
+        }, REMOTE_ADDR=address)
+
+    def test_01_ip_bucket(self, client, buckets, django_assert_num_queries):
+        for number in range(3):
+            assert self.signup(client, number).status_code == HTTPStatus.OK
+
+        with django_assert_num_queries(0):
+            response = self.signup(client, 3)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что запросы сверх лимита с одного адреса '
+            'отклоняются со статусом 429 без обращения к базе.'
+        )
+        assert response['Retry-After'] == '20'
+        assert self.signup(client, 3, '10.0.0.2').status_code == (
+            HTTPStatus.OK
+        )
+
+        buckets[0] += 20
+        assert self.signup(client, 4).status_code == HTTPStatus.OK
+        assert self.signup(client, 5).status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        )
+
+    def test_02_username_bucket(self, client, buckets):
+        data = {'username': 'User1', 'confirmation_code': 'wrong'}
+        for address in ('10.0.0.1', '10.0.0.2'):
+            response = client.post(
+                self.url_token, data=data, REMOTE_ADDR=address
+            )
+            assert response.status_code == HTTPStatus.NOT_FOUND
+        data['username'] = 'user1'
+        response = client.post(
+            self.url_token, data=data, REMOTE_ADDR='10.0.0.3'
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что попытки для одного username ограничены '
+            'независимо от адреса.'
+        )
+
+    def test_03_disabled_bucket(self, client, settings, buckets):
+        settings.THROTTLE_BUCKETS['auth_ip']['rate'] = None
+        settings.THROTTLE_BUCKETS['auth_username']['rate'] = None
+        for number in range(5):
+            assert self.signup(client, number).status_code == HTTPStatus.OK
+
+    def test_04_shared_buckets(self, client, buckets):
+        from django.core.cache import cache, caches
+
+        from users.throttling import IPTokenBucketThrottle
+
+        for number in range(3):
+            assert self.signup(client, number).status_code == HTTPStatus.OK
+        cache.clear()
+        key = IPTokenBucketThrottle().get_cache_key('127.0.0.1')
+        assert caches['shared'].get(key) is not None, (
+            'Проверьте, что ведра хранятся в общем кэше `shared`.'
+        )
+        assert self.signup(client, 3).status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        )
@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Signup:
+    url_signup = '/api/v1/auth/signup/'
+
+    def test_01_signup_queries(self, client, django_assert_num_queries):
+        from users.models import CustomUser, OutboxEmail
+
+        data = {'email': 'user@yamdb.fake', 'username': 'user'}
+        # BEGIN, SELECT id, INSERT пользователя, INSERT письма.
+        with django_assert_num_queries(4):
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == data
+        code = CustomUser.objects.get(username='user').confirmation_code
+
+        # BEGIN, SELECT id, UPDATE кода, INSERT письма.
+        with django_assert_num_queries(4):
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == HTTPStatus.OK
+        user = CustomUser.objects.get(username='user')
+        assert user.confirmation_code != code, (
+            'Проверьте, что повторная регистрация выдает новый код.'
+        )
+        assert list(OutboxEmail.objects.values_list('body', flat=True)) == [
+            f'Ваш код для получения JWT токена {code}',
+            f'Ваш код для получения JWT токена {user.confirmation_code}',
+        ]
+
+    def test_02_conflicts(self, client):
+        from users.models import CustomUser, OutboxEmail
+
+        client.post(self.url_signup, data={
+            'email': 'user@yamdb.fake', 'username': 'user'
+        })
+        response = client.post(self.url_signup, data={
+            'email': 'other@yamdb.fake', 'username': 'user'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert list(response.json()) == ['username']
+        response = client.post(self.url_signup, data={
+            'email': 'user@yamdb.fake', 'username': 'other'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert list(response.json()) == ['email']
+        assert CustomUser.objects.count() == 1
+        assert OutboxEmail.objects.count() == 1, (
+            'Проверьте, что при отклоненной регистрации письмо не ставится '
+            'в очередь.'
+        )
+
+    def test_03_code_survives_cached_user(self, client, user, user_client):
+        data = {'email': user.email, 'username': user.username}
+        user_client.get('/api/v1/users/me/')
+        client.post(self.url_signup, data=data)
+        user.refresh_from_db()
+
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'bio': 'О себе'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': user.confirmation_code,
+        })
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение профиля не затирает новый код '
+            'подтверждения.'
+        )